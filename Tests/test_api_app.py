@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("RENDER_WORKERS", "1")  # one worker per pool is enough here
+os.environ.setdefault("JOB_WORKERS", "1")
+
+from api import app as app_module
+from src.classes.job_queue import LocalJobQueue
+
+BODY = {
+    "params": {"backlog": 50, "t_min": 2, "t_mode": 4, "t_max": 7, "iterations": 2000},
+    "risks": [{"name": "Dependencies", "probability": 0.2, "impact": 0.3}],
+    "format": "data",
+    "seed": 7,
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app_module.app) as client:
+        yield client
+
+
+def poll(client, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.05)
+
+
+def test_job_is_submitted_polled_and_fetched(client):
+
+    response = client.post("/jobs", json=BODY)
+    assert response.status_code == 202
+
+    job = poll(client, response.json()["id"])
+    assert job["status"] == "done"
+    assert job["result"]["seed"] == 7
+    assert job["result"]["stats"] == client.post("/simulate", json=BODY).json()["stats"]
+
+
+def test_queued_job_is_cancelled(client, monkeypatch):
+
+    release = threading.Event()
+    with LocalJobQueue(workers=1, executor="thread") as queue:
+        monkeypatch.setattr(app_module, "JOB_QUEUE", queue)
+        queue.submit(release.wait, 10)  # keeps the only worker busy
+
+        job = client.post("/jobs", json=BODY).json()
+        assert job["status"] == "queued"
+        assert client.delete(f"/jobs/{job['id']}").json()["status"] == "cancelled"
+        assert client.get("/jobs").json()["queued"] == 0
+        release.set()
+
+
+def test_unknown_job_is_not_found(client):
+
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.delete("/jobs/unknown").status_code == 404
+
+
+def test_full_queue_is_unavailable(client, monkeypatch):
+
+    monkeypatch.setattr(app_module.JOB_QUEUE, "max_queued", 0)
+
+    response = client.post("/jobs", json=BODY)
+    assert response.status_code == 503
+    assert response.json()["detail"]["error"] == "unavailable"
+
+
+def test_repeated_simulate_is_served_from_the_result_cache(client):
+
+    body = {**BODY, "seed": 11}
+    first = client.post("/simulate", json=body)
+    hits = app_module.RESULT_CACHE.stats()["hits"]
+    second = client.post("/simulate", json=body)
+
+    assert first.headers["X-Cache"] == "miss"
+    assert second.headers["X-Cache"] == "hit"
+    assert app_module.RESULT_CACHE.stats()["hits"] == hits + 1
+    assert second.content == first.content
@@ -0,0 +1,32 @@
+from api.schemas import RunRequest
+from api.service import request_key, run_simulation
+
+BODY = {
+    "params": {"backlog": 50, "t_min": 2, "t_mode": 4, "t_max": 7},
+    "risks": [{"name": "Dependencies", "probability": 0.2, "impact": 0.3},
+              {"name": "Rework", "probability": 0.1, "impact": 0.5}],
+    "format": "data",
+    "seed": 7,
+}
+
+
+def test_request_key_is_canonical():
+
+    reordered = {**BODY, "risks": BODY["risks"][::-1]}
+    spaced = {**BODY, "risks": [{**risk, "name": f"  {risk['name']} "} for risk in BODY["risks"]]}
+    key = request_key(RunRequest.model_validate(BODY))
+
+    assert request_key(RunRequest.model_validate(reordered)) == key
+    assert request_key(RunRequest.model_validate(spaced)) == key
+    assert request_key(RunRequest.model_validate({**BODY, "seed": 8})) != key
+    assert request_key(RunRequest.model_validate({**BODY, "format": "png"})) != key
+
+
+def test_seeded_requests_give_the_same_response():
+
+    first = run_simulation(RunRequest.model_validate(BODY))
+    reordered = run_simulation(RunRequest.model_validate({**BODY, "risks": BODY["risks"][::-1]}))
+
+    assert first == reordered
+    assert first.seed == 7 and first.stats["p85"] >= first.stats["p50"]
+    assert run_simulation(RunRequest.model_validate({**BODY, "seed": None})).seed is not None
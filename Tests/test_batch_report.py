@@ -0,0 +1,47 @@
+import os
+import pytest
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.batch_report import BatchReportGenerator, STAGES
+
+
+@pytest.fixture
+def scenarios():
+    risks = [Risk("Dependencies", 0.3, 0.5)]
+    return {
+        "Team A": (SimulationParameters(60, 2, 4, 7, 1000), risks),
+        "Team B": (SimulationParameters(90, 3, 5, 8, 1000), []),
+        "Team C/Q3": (SimulationParameters(40, 1, 3, 6, 1000), risks),
+    }
+
+
+def test_combined_report_is_the_same_for_any_number_of_workers(scenarios, tmp_path):
+
+    progress = []
+    serial = BatchReportGenerator(scenarios, seed=3, workers=1).generate(
+        str(tmp_path / "serial.pdf"), on_progress=lambda done, total, name, timings: progress.append((done, total, name)))
+    parallel = BatchReportGenerator(scenarios, seed=3, workers=2).generate(str(tmp_path / "parallel.pdf"))
+
+    assert progress == [(1, 3, "Team A"), (2, 3, "Team B"), (3, 3, "Team C/Q3")]
+    assert serial["stats"] == parallel["stats"]
+    assert list(serial["stats"]) == list(scenarios)
+    assert set(serial["totals"]) == set(STAGES)
+    assert all(set(timing) == set(STAGES) for timing in serial["timings"].values())
+    with open(serial["paths"][0], "rb") as f:
+        assert f.read(5) == b"%PDF-"
+
+
+def test_one_report_per_scenario(scenarios, tmp_path):
+
+    result = BatchReportGenerator(scenarios, seed=3, workers=2).generate(str(tmp_path / "reports"), combined=False)
+
+    assert sorted(os.listdir(tmp_path / "reports")) == ["Team_A.pdf", "Team_B.pdf", "Team_C_Q3.pdf"]
+    assert result["paths"] == [str(tmp_path / "reports" / name) for name in ("Team_A.pdf", "Team_B.pdf", "Team_C_Q3.pdf")]
+    assert all(timing["pdf"] > 0 for timing in result["timings"].values())
+
+
+def test_file_names_must_be_unique(scenarios, tmp_path):
+
+    scenarios["Team/A"] = scenarios["Team A"]
+    with pytest.raises(ValueError):
+        BatchReportGenerator(scenarios).generate(str(tmp_path), combined=False)
@@ -0,0 +1,86 @@
+import tracemalloc
+import numpy as np
+import pytest
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.simulator import Simulator
+from classes.batch_simulator import BatchSimulator
+
+
+BASE = (SimulationParameters(150, 3, 5, 9, 20000), [Risk("Dependencies", 0.3, 0.7)])
+SLOWER = (SimulationParameters(150, 2, 4, 7, 20000), [Risk("Dependencies", 0.3, 0.7), Risk("Vacations", 0.1, 0.5)])
+
+
+def test_batch_matches_simulator_distribution():
+
+    results = BatchSimulator({"base": BASE, "slower": SLOWER}, seed=1).run()
+
+    for name, (params, risks) in {"base": BASE, "slower": SLOWER}.items():
+        reference = Simulator(params, risks, seed=2).run_simulation()
+        assert results[name].shape == (20000,)
+        for p in (50, 85, 95):
+            assert abs(np.percentile(results[name], p) - np.percentile(reference, p)) <= 1
+
+
+def test_scenario_results_do_not_depend_on_the_rest_of_the_batch():
+
+    alone = BatchSimulator({"base": BASE}, seed=3, block_weeks=40).run()["base"]
+    together = BatchSimulator({"slower": SLOWER, "base": BASE}, seed=3, block_weeks=40).run()["base"]
+
+    assert np.array_equal(alone, together)
+
+
+def test_common_random_numbers_reduce_the_noise_of_differences():
+
+    crn, independent = [], []
+    for seed in range(10):
+        batch = BatchSimulator({"base": BASE, "slower": SLOWER}, seed=seed).run(num_sim=2000)
+        crn.append(batch["slower"].mean() - batch["base"].mean())
+        base = BatchSimulator({"base": BASE}, seed=100 + seed).run(num_sim=2000)["base"]
+        independent.append(batch["slower"].mean() - base.mean())
+
+    assert np.std(crn) < np.std(independent) / 2
+
+
+def test_small_memory_budget_gives_same_results():
+
+    reference = BatchSimulator({"base": BASE, "slower": SLOWER}, seed=4).run(num_sim=5000)
+    chunked = BatchSimulator({"base": BASE, "slower": SLOWER}, seed=4, memory_budget_mb=0.5).run(num_sim=5000)
+
+    for name in reference:
+        assert np.array_equal(reference[name], chunked[name])
+
+
+def test_max_weeks_cap_raises():
+
+    with pytest.raises(RuntimeError):
+        BatchSimulator({"base": BASE}).run(max_weeks=10)
+
+
+@pytest.mark.parametrize("scenarios", [{}, [BASE], None])
+def test_invalid_scenarios(scenarios):
+
+    with pytest.raises(ValueError):
+        BatchSimulator(scenarios)
+
+
+def test_invalid_scenario_tuple():
+
+    with pytest.raises(TypeError):
+        BatchSimulator({"base": (BASE[0],)})
+
+
+def test_chunked_run_stays_within_memory_budget():
+
+    scenarios = {f"backlog {backlog}": (SimulationParameters(backlog, 3, 5, 9, 5000), SLOWER[1])
+                 for backlog in range(100, 160, 2)}
+    output = 30 * 5000 * 8 #the completion weeks themselves
+
+    tracemalloc.start()
+    try:
+        BatchSimulator(scenarios, seed=5, memory_budget_mb=4).run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 4 * 1024 ** 2 + 2 * output
@@ -0,0 +1,86 @@
+import time
+import numpy as np
+import pytest
+from classes.byte_cache import ByteCache, content_key
+from classes.simulation_visualizer import SimulationVisualizer
+from classes.completion_histogram import CompletionHistogram
+
+
+def test_lru_evicts_by_bytes():
+
+    cache = ByteCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a") #b is now the least recently used
+    cache.put("c", b"123")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"12345"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 10
+
+
+def test_disk_tier_survives_the_memory_tier(tmp_path):
+
+    cache = ByteCache(max_bytes=1024, disk_dir=str(tmp_path))
+    cache.put("key", b"payload")
+    cache.clear()
+
+    assert ByteCache(disk_dir=str(tmp_path)).get("key") == b"payload"
+    assert cache.get("key") == b"payload"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_content_key_depends_on_content_and_dtype():
+
+    weeks = np.array([3, 4, 5])
+
+    assert content_key(weeks, {"bins": 30}) == content_key(weeks.copy(), {"bins": 30})
+    assert content_key(weeks, {"bins": 30}) != content_key(weeks, {"bins": 20})
+    assert content_key(weeks) != content_key(weeks.astype(np.uint16))
+
+
+def test_visualizer_skips_rendering_on_a_hit():
+
+    cache = ByteCache()
+    weeks = np.random.default_rng(1).integers(20, 40, size=500)
+
+    first = SimulationVisualizer(weeks, cache=cache).plot_cdf()
+    again = SimulationVisualizer(weeks[::-1].copy(), cache=cache).plot_cdf() #same counts, other order
+    SimulationVisualizer(weeks, cache=cache).plot_convergence()
+    SimulationVisualizer(weeks[::-1].copy(), cache=cache).plot_convergence() #order matters here
+
+    assert first == again
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 3
+
+
+def test_integer_weeks_and_their_histogram_share_keys():
+
+    weeks = np.random.default_rng(2).integers(20, 40, size=500)
+    key = SimulationVisualizer(weeks).cache_key("histogram")
+
+    assert SimulationVisualizer(weeks[::-1].copy()).cache_key("histogram") == key
+    assert SimulationVisualizer(CompletionHistogram.from_results(weeks)).cache_key("histogram") == key
+    assert SimulationVisualizer(weeks.astype(np.float64)).cache_key("histogram") != key
+
+
+def test_only_bytes_are_stored():
+
+    with pytest.raises(TypeError):
+        ByteCache().put("key", "text")
+
+
+def test_entries_expire_after_ttl(tmp_path):
+
+    cache = ByteCache(disk_dir=str(tmp_path), ttl=0.05)
+    cache.put("key", b"payload")
+    assert cache.get("key") == b"payload"
+
+    time.sleep(0.1)
+    assert cache.get("key") is None #expired in memory and on disk
+    assert cache.stats()["expirations"] == 2
+    assert cache.stats()["bytes"] == 0
+
+    with pytest.raises(ValueError):
+        ByteCache(ttl=0)
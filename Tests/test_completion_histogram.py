@@ -0,0 +1,99 @@
+import json
+import numpy as np
+import pytest
+from classes.completion_histogram import CompletionHistogram
+from classes.simulation_analyzer import SimulationAnalyzer
+
+
+@pytest.fixture
+def weeks():
+    return np.random.default_rng(4).binomial(60, 0.5, size=10001).astype(np.uint16) + 10
+
+
+def test_statistics_match_the_raw_results(weeks):
+
+    histogram = CompletionHistogram.from_results(weeks)
+
+    assert histogram.num_sim == weeks.size
+    assert np.allclose(histogram.percentile([5, 50, 85, 95, 100]), np.percentile(weeks, [5, 50, 85, 95, 100]))
+    assert histogram.percentile(85) == np.percentile(weeks, 85)
+    assert histogram.mean() == pytest.approx(weeks.mean())
+    assert histogram.std() == pytest.approx(weeks.std())
+    assert histogram.std(ddof=1) == pytest.approx(weeks.std(ddof=1))
+
+    cdf_weeks, cdf = histogram.cdf()
+    assert cdf[-1] == 1.0
+    assert np.allclose(cdf, np.searchsorted(np.sort(weeks), cdf_weeks, side="right") / weeks.size)
+
+
+def test_merging_shards_is_exact(weeks):
+
+    shards = [CompletionHistogram.from_results(part) for part in np.array_split(weeks, 4)]
+    merged = shards[0] + shards[1] + shards[2] + shards[3]
+
+    assert merged == CompletionHistogram.from_results(weeks)
+    assert CompletionHistogram.from_results(weeks[:0]) + merged == merged
+    with pytest.raises(TypeError):
+        hash(merged)  # equal by value, so not hashable
+
+
+def test_outliers_and_serialization():
+
+    weeks = np.array([10, 11, 12, 10, 11, 12, 10, 11, 12, 10, 11, 90])
+    histogram = CompletionHistogram.from_results(weeks)
+
+    filtered = histogram.filter_outliers(z_thresh=3.0)
+    expected = SimulationAnalyzer(weeks).filter_outliers(z_thresh=3.0)["completion_week"].to_numpy()
+    assert np.array_equal(filtered.to_results(), np.sort(expected))
+
+    restored = CompletionHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+    assert restored == histogram
+    assert len(json.dumps(histogram.to_dict())) < 400
+
+
+def test_analyzer_accepts_a_histogram(weeks):
+
+    from_histogram = SimulationAnalyzer(CompletionHistogram.from_results(weeks)).describe()
+    from_results = SimulationAnalyzer(weeks).describe()
+
+    assert from_histogram == pytest.approx(from_results)
+
+
+def test_analyzer_reads_the_histogram_counts(weeks, monkeypatch):
+
+    analyzer = SimulationAnalyzer(CompletionHistogram.from_results(weeks))
+    expected = SimulationAnalyzer(np.sort(weeks))
+    monkeypatch.setattr(CompletionHistogram, "to_results", lambda self: pytest.fail("expanded the histogram"))
+
+    assert analyzer.quantiles((0.05, 0.5, 0.95)) == pytest.approx(expected.quantiles((0.05, 0.5, 0.95)))
+    assert analyzer.moments() == pytest.approx(expected.moments())
+    assert np.array_equal(analyzer.outlier_mask(2.0), expected.outlier_mask(2.0))
+
+
+def test_invalid_results():
+
+    with pytest.raises(TypeError):
+        CompletionHistogram.from_results(np.array([1.5, 2.0]))
+
+
+def test_bootstrap_intervals_cover_the_percentile(weeks):
+
+    histogram = CompletionHistogram.from_results(weeks)
+    intervals = histogram.bootstrap_intervals([50, 85], confidence=0.95, num_resamples=2000, seed=1)
+
+    for percentile, (low, high) in intervals.items():
+        assert low <= histogram.percentile(percentile) <= high
+        assert high - low <= 2 #10001 replicas pin the percentile to a week or two
+
+    naive = [np.percentile(np.random.default_rng(i).choice(weeks, weeks.size), 85) for i in range(2000)]
+    assert intervals[85] == pytest.approx(tuple(np.quantile(naive, [0.025, 0.975])), abs=1)
+
+
+def test_summary_with_intervals(weeks):
+
+    table = SimulationAnalyzer(weeks).summary_with_intervals(percentiles=(0.5, 0.85), seed=2)
+
+    assert list(table.index) == ["completion_week", "ci_low", "ci_high"]
+    assert list(table.columns) == ["p50", "p85"]
+    assert (table.loc["ci_low"] <= table.loc["completion_week"]).all()
+    assert (table.loc["completion_week"] <= table.loc["ci_high"]).all()
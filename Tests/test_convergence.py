@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from classes.convergence import convergence_series, running_order_statistics
+from classes.simulation_visualizer import SimulationVisualizer
+
+
+@pytest.fixture
+def weeks():
+    return np.random.default_rng(5).binomial(40, 0.5, size=3000) + 10
+
+
+def test_series_matches_every_prefix(weeks):
+
+    series = convergence_series(weeks, percentile=85)
+
+    assert np.array_equal(series["n"], np.arange(1, weeks.size + 1))
+    for size in (1, 2, 7, 150, 2999, 3000):
+        prefix = weeks[:size]
+        assert series["percentile"][size - 1] == pytest.approx(np.percentile(prefix, 85))
+        assert series["mean"][size - 1] == pytest.approx(prefix.mean())
+        assert series["low"][size - 1] <= series["percentile"][size - 1] <= series["high"][size - 1]
+
+
+def test_step_selects_prefixes(weeks):
+
+    series = convergence_series(weeks, step=200)
+
+    assert np.array_equal(series["n"], np.arange(200, 3001, 200))
+    assert series["percentile"][-1] == pytest.approx(np.percentile(weeks, 85))
+
+
+def test_float_results_match_sorting():
+
+    values = np.random.default_rng(1).normal(size=5000)
+    n = np.array([10, 5000])
+    (low,) = running_order_statistics(values, n, [np.array([3, 4000])])
+
+    assert low[0] == np.sort(values[:10])[3]
+    assert low[1] == np.sort(values)[4000]
+
+
+def test_order_statistics_at_every_prefix_with_many_distinct_values():
+
+    values = np.random.default_rng(2).integers(0, 6000, size=3000)
+    n = np.arange(1, values.size + 1)
+    ranks = [n // 3, n - 1]
+    first, last = running_order_statistics(values, n, ranks)
+
+    for size in n:
+        prefix = np.sort(values[:size])
+        assert first[size - 1] == prefix[size // 3]
+        assert last[size - 1] == prefix[-1]
+
+
+def test_plot_convergence_at_every_replica(weeks):
+
+    assert isinstance(SimulationVisualizer(weeks).plot_convergence(), str)
+
+    with pytest.raises(ValueError):
+        SimulationVisualizer(weeks).plot_convergence(step=0)
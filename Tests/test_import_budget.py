@@ -0,0 +1,16 @@
+import importlib.util
+import os
+import pytest
+
+#the targets and heavy modules live in the startup benchmark, which also checks the
+#import time budgets (benchmarks/bench_imports.py --check)
+spec = importlib.util.spec_from_file_location(
+    "bench_imports", os.path.join(os.path.dirname(__file__), "..", "benchmarks", "bench_imports.py"))
+bench_imports = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_imports)
+
+
+@pytest.mark.parametrize("target", list(bench_imports.TARGETS))
+def test_no_heavy_module_on_import(target):
+
+    assert bench_imports.heavy_imports(target) == []
@@ -0,0 +1,98 @@
+import math
+import os
+import threading
+import time
+import pytest
+from classes.job_queue import JobQueue, LocalJobQueue, create_queue
+
+
+def wait(queue, job, timeout=30):
+    deadline = time.time() + timeout
+    while not queue.get(job.id).finished:
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return queue.get(job.id)
+
+
+def test_jobs_run_in_a_process_pool():
+
+    with LocalJobQueue(workers=2) as queue:
+        jobs = [queue.submit(math.factorial, n) for n in (5, 10)]
+        failing = queue.submit(math.factorial, -1)
+
+        assert [wait(queue, job).result for job in jobs] == [120, 3628800]
+        assert wait(queue, failing).status == "failed"
+        assert failing.error.startswith("ValueError")
+
+
+def test_jobs_fail_when_the_pool_breaks():
+
+    with LocalJobQueue(workers=1) as queue:
+        crash = queue.submit(os._exit, 1)
+        assert wait(queue, crash).error.startswith("BrokenProcessPool")
+
+        after = queue.submit(math.factorial, 5)  # the pool refuses new work
+        assert after.status == "failed"
+        assert after.error.startswith("BrokenProcessPool")
+        assert queue.stats()["running"] == 0
+
+
+def test_priorities_cancel_and_the_reserved_worker():
+
+    release = threading.Event()
+    order = []
+
+    def task(name):
+        release.wait(10)
+        order.append(name)
+        return name
+
+    with LocalJobQueue(workers=2, executor="thread") as queue:
+        big = queue.submit(task, "big")
+        waiting = queue.submit(task, "normal")  # the last worker is kept for high jobs
+        low = queue.submit(task, "low", priority="low")
+        small = queue.submit(task, "small", priority="high")
+
+        assert [job.status for job in (big, waiting, low, small)] == ["running", "queued", "queued", "running"]
+        assert queue.cancel(low.id).status == "cancelled"
+        assert queue.stats() == {"workers": 2, "queued": 1, "running": 2, "finished": 1}
+
+        release.set()
+        assert wait(queue, waiting).result == "normal"
+        assert "low" not in order
+        assert queue.cancel(waiting.id).status == "done"  # finished jobs are left as they are
+        assert queue.cancel("unknown") is None
+
+
+def test_queue_limits():
+
+    with pytest.raises(ValueError):
+        create_queue("redis")
+    with pytest.raises(ValueError):
+        LocalJobQueue(workers=0)
+
+    release = threading.Event()
+    with LocalJobQueue(workers=1, max_queued=1, executor="thread") as queue:
+        queue.submit(release.wait, 10)
+        queue.submit(release.wait, 10)
+        with pytest.raises(RuntimeError):
+            queue.submit(release.wait, 10)
+        with pytest.raises(ValueError):
+            queue.submit(release.wait, 10, priority="urgent")
+        release.set()
+
+
+def test_incomplete_backend_fails_on_construction():
+
+    class NoStats(JobQueue):
+        def submit(self, function, *args, priority="normal"):
+            return None
+
+        def get(self, job_id):
+            return None
+
+        def cancel(self, job_id):
+            return None
+
+    with pytest.raises(TypeError):
+        NoStats()
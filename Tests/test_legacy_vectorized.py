@@ -0,0 +1,61 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "legacySimulator"))
+
+from simulation.throughput_function import simulate_project_delivery, triangular_th_generator, get_capacity_multiplier
+from simulation.vectorized import simulate_project_delivery_vectorized, weekly_throughput_pmf
+from simulation.simulation_runner import montecarlo_simulation
+
+
+RISKS = [{"prob": 0.05, "impact": 0.90}, {"prob": 0.10, "impact": 0.80}, {"prob": 0.20, "impact": 1.30}]
+
+
+@pytest.mark.parametrize("risks", [
+    RISKS,
+    [{"prob": 0.6, "impact": 0.5}, {"prob": 0.7, "impact": 0.8}, {"prob": 0.2, "impact": 1.3}], #adds up to more than 1
+])
+def test_weekly_pmf_matches_scalar_weeks(risks):
+
+    np.random.seed(5)
+    weekly = [max(1, round(triangular_th_generator(3, 5, 9) * get_capacity_multiplier(risks))) for _ in range(100000)]
+    pmf = weekly_throughput_pmf(3, 5, 9, risks)
+
+    observed = np.bincount(weekly, minlength=pmf.size) / len(weekly)
+    assert observed.size == pmf.size
+    assert np.abs(observed - pmf).max() < 0.005
+
+
+def test_weekly_pmf_defaults_to_the_legacy_risks():
+
+    assert np.array_equal(weekly_throughput_pmf(), weekly_throughput_pmf(3, 5, 9, RISKS))
+    assert weekly_throughput_pmf(risks=[]).sum() == pytest.approx(1)
+
+
+@pytest.mark.parametrize("config", [
+    {"ticket_goal": 150, "min_val": 3, "mode": 5, "max_val": 9, "risks": RISKS},
+    {"ticket_goal": 40, "min_val": 0, "mode": 1, "max_val": 2, "risks": [{"prob": 0.5, "impact": 0.2}]}, #floor of 1 ticket
+])
+def test_vectorized_matches_scalar_distribution(config):
+
+    np.random.seed(3)
+    scalar = np.array([simulate_project_delivery(**config) for _ in range(3000)])
+    vectorized = simulate_project_delivery_vectorized(runs=30000, rng=np.random.default_rng(3), **config)
+
+    for p in (50, 85, 95):
+        assert abs(np.percentile(vectorized, p) - np.percentile(scalar, p)) <= 1
+    assert abs(vectorized.mean() - scalar.mean()) < 0.25
+    assert vectorized.max() <= config["ticket_goal"] #at least 1 ticket every week
+
+
+def test_montecarlo_simulation_uses_ticket_goal():
+
+    np.random.seed(1)
+    short = montecarlo_simulation(runs=200, ticket_goal=30)
+    fast = montecarlo_simulation(runs=200, ticket_goal=30, vectorized=True, rng=np.random.default_rng(1))
+
+    assert max(short) < 15 #the default 150 tickets take 20+ weeks
+    assert max(fast) < 15
+    assert len(fast) == 200
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from classes.byte_cache import ByteCache
+from classes.simulation_visualizer import SimulationVisualizer
+from classes.render_pipeline import RenderPipeline
+
+PLOTS = {"histogram": {"bins": 20}, "cdf": {}, "convergence": {"step": 10}}
+
+
+@pytest.fixture
+def weeks():
+    return np.random.default_rng(2).integers(20, 40, size=2000)
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_pipeline_matches_sequential_rendering(weeks, executor):
+
+    visualizer = SimulationVisualizer(weeks)
+    sequential = {kind: visualizer.plot(kind, **options) for kind, options in PLOTS.items()}
+
+    with RenderPipeline(workers=2, executor=executor) as pipeline:
+        images = pipeline.render(visualizer, PLOTS)
+
+    assert list(images) == list(PLOTS)
+    assert images == sequential
+
+
+def test_pipeline_fills_and_reads_the_cache(weeks):
+
+    cache = ByteCache()
+    with RenderPipeline(workers=2, executor="thread") as pipeline:
+        pipeline.render(SimulationVisualizer(weeks, cache=cache), PLOTS)
+        pipeline.render(SimulationVisualizer(weeks, cache=cache), PLOTS)
+
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["hits"] == 3
+    #the keys used by the pipeline are the ones the visualizer uses itself
+    SimulationVisualizer(weeks, cache=cache)._plot_histogram(bins=20)
+    assert cache.stats()["hits"] == 4
+
+
+def test_unknown_plot_kind(weeks):
+
+    with pytest.raises(ValueError):
+        SimulationVisualizer(weeks).plot("pie")
+
+
+def test_svg_and_data_formats(weeks):
+
+    cache = ByteCache()
+    visualizer = SimulationVisualizer(weeks, cache=cache)
+    svg = visualizer.plot_cdf(format="svg")
+    assert svg.lstrip().startswith("<?xml") and "<svg" in svg
+    #each format has its own cache entry
+    assert visualizer.plot_cdf() != svg
+    assert cache.stats()["entries"] == 2
+
+    histogram = visualizer.plot("histogram", bins=20, format="data")
+    assert len(histogram["edges"]) == 21 and sum(histogram["counts"]) == weeks.size
+    assert histogram["markers"]["P85"] == np.percentile(weeks, 85)
+
+    cdf = visualizer.plot_cdf(format="data")
+    assert cdf["x"] == sorted(set(weeks.tolist())) and cdf["cdf"][-1] == 1.0
+
+    convergence = visualizer.plot_convergence(format="data")
+    assert convergence["n"][0] == 1 and convergence["n"][-1] == weeks.size
+    assert convergence["estimate"][-1] == np.percentile(weeks, 85)
+
+    with pytest.raises(ValueError):
+        visualizer.plot_cdf(format="jpeg")
+
+
+def test_pipeline_formats(weeks):
+
+    plots = {"histogram": {"format": "svg"}, "cdf": {"format": "data"}, "convergence": {"step": 10}}
+    visualizer = SimulationVisualizer(weeks, cache=ByteCache())
+    with RenderPipeline(workers=2, executor="thread") as pipeline:
+        first = pipeline.render(visualizer, plots)
+        second = pipeline.render(visualizer, plots)
+
+    assert first == second == {kind: visualizer.plot(kind, **options) for kind, options in plots.items()}
@@ -0,0 +1,54 @@
+import pytest
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.sensitivity_analyzer import SensitivityAnalyzer
+
+
+def make_analyzer(**kwargs):
+
+    params = SimulationParameters(backlog=150, th_min=3, th_ex=5, th_max=9, num_sim=4000)
+    risks = [Risk("Dependencies", 0.3, 0.7), Risk("Vacations", 0.05, 0.5)]
+    return SensitivityAnalyzer(params, risks, seed=5, **kwargs)
+
+
+def test_one_at_a_time_points_are_valid_and_move_one_factor():
+
+    points = make_analyzer().one_at_a_time(steps=(-0.5, 0.5))
+
+    assert {"th_min", "backlog", "Dependencies.impact"} <= {point["factor"] for point in points}
+    assert all(len(point["changes"]) == 1 for point in points)
+    #th_ex 5 -> 8 would break th_ex < th_max, so it's left out
+    assert {"factor": "th_ex", "step": 0.5, "changes": {"th_ex": 8}} not in points
+
+
+def test_tornado_ranks_backlog_first_and_has_the_right_signs():
+
+    table = make_analyzer().tornado(steps=(-0.2, 0.2))
+
+    assert table[0]["factor"] == "backlog"
+    assert [entry["swing"] for entry in table] == sorted((entry["swing"] for entry in table), reverse=True)
+    backlog = table[0]
+    assert backlog["low_P85"] < 0 < backlog["high_P85"]
+
+
+def test_shared_seeds_make_the_table_independent_of_the_workers():
+
+    points = make_analyzer().grid({"th_max": [8, 9, 10], "Dependencies.probability": [0.2, 0.3]})
+    serial = make_analyzer().run(points, workers=1)
+    parallel = make_analyzer().run(points, workers=3)
+
+    assert len(points) == 6
+    assert serial == parallel
+
+
+def test_base_point_has_zero_delta():
+
+    rows = make_analyzer().run([{"factor": "grid", "step": None, "changes": {}}])
+
+    assert rows[0]["delta_P50"] == rows[0]["delta_P85"] == rows[0]["delta_P95"] == 0
+
+
+def test_unknown_factor():
+
+    with pytest.raises(ValueError):
+        make_analyzer().grid({"velocity": [1, 2]})
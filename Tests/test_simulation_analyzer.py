@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from classes.simulation_analyzer import SimulationAnalyzer
+
+
+@pytest.fixture
+def weeks():
+    return np.random.default_rng(3).integers(20, 60, size=5001).astype(np.uint16)
+
+
+def test_summary_matches_pandas_quantiles(weeks):
+
+    summary = SimulationAnalyzer(weeks).summary(percentiles=(0.05, 0.5, 0.85, 0.95))
+    series = pd.Series(weeks)
+
+    assert list(summary.columns) == ["p5", "p50", "p85", "p95"]
+    assert list(summary.index) == ["completion_week"]
+    for column, q in zip(summary.columns, (0.05, 0.5, 0.85, 0.95)):
+        assert summary.loc["completion_week", column] == pytest.approx(series.quantile(q))
+
+
+def test_overall_stats_matches_pandas_describe(weeks):
+
+    stats = SimulationAnalyzer(weeks).overall_stats()
+    expected = pd.Series(weeks, name="completion_week").describe()
+
+    assert stats.name == expected.name
+    assert list(stats.index) == list(expected.index)
+    assert np.allclose(stats.to_numpy(), expected.to_numpy())
+
+
+def test_filter_outliers_keeps_the_dataframe_shape():
+
+    weeks = np.array([10, 11, 12, 10, 11, 12, 10, 11, 12, 10, 11, 90])
+    filtered = SimulationAnalyzer(weeks).filter_outliers(z_thresh=3.0)
+
+    assert list(filtered.columns) == ["sim_run", "completion_week"]
+    assert 90 not in filtered["completion_week"].to_numpy()
+    assert list(filtered.index) == list(range(11))
+
+
+def test_results_are_sorted_once(weeks):
+
+    analyzer = SimulationAnalyzer(weeks)
+    analyzer.summary()
+    first = analyzer.sorted_weeks
+    analyzer.overall_stats()
+
+    assert analyzer.sorted_weeks is first
+    assert np.array_equal(first, np.sort(weeks))
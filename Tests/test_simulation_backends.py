@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.simulator import Simulator
+from classes.simulation_backends import BACKENDS, NumbaBackend, SimulationBackend, get_backend, register_backend
+
+
+def make_simulator(num_sim=20000, **kwargs):
+
+    params = SimulationParameters(backlog=150, th_min=3, th_ex=5, th_max=9, num_sim=num_sim)
+    risks = [Risk("Vacations", 0.2, 0.5), Risk("Dependencies", 0.3, 0.7)]
+    return Simulator(params, risks, **kwargs)
+
+
+def test_numba_engine_matches_numpy_distribution():
+
+    pytest.importorskip("numba")
+
+    vectorized = make_simulator(seed=1).run_simulation(engine="numpy")
+    compiled = make_simulator(seed=2).run_simulation(engine="numba")
+
+    assert compiled.dtype == vectorized.dtype
+    for p in (50, 85, 95):
+        assert abs(np.percentile(compiled, p) - np.percentile(vectorized, p)) <= 1
+    assert abs(compiled.mean() - vectorized.mean()) < 0.2
+
+
+def test_numba_engine_is_reproducible_and_honours_max_weeks():
+
+    pytest.importorskip("numba")
+
+    first = make_simulator(num_sim=1000, seed=5).run_simulation(engine="numba")
+    second = make_simulator(num_sim=1000, seed=5).run_simulation(engine="numba")
+    assert np.array_equal(first, second)
+
+    with pytest.raises(RuntimeError):
+        make_simulator(num_sim=1000).run_simulation(engine="numba", max_weeks=10)
+
+
+def test_missing_numba_falls_back_to_numpy(monkeypatch):
+
+    monkeypatch.setattr(NumbaBackend, "is_available", lambda self: False)
+
+    with pytest.warns(RuntimeWarning):
+        fallback = make_simulator(num_sim=1000, seed=3).run_simulation(engine="numba")
+
+    assert np.array_equal(fallback, make_simulator(num_sim=1000, seed=3).run_simulation(engine="numpy"))
+
+
+def test_numba_engine_rejects_variance_reduction():
+
+    pytest.importorskip("numba")
+
+    with pytest.raises(ValueError):
+        make_simulator(num_sim=1000, sampling="lhs").run_simulation(engine="numba")
+
+
+def test_register_custom_backend(monkeypatch):
+
+    class ConstantBackend(SimulationBackend):
+        name = "constant"
+
+        def simulate(self, simulator, rng, num_rows, block_weeks, max_weeks):
+            return np.full(num_rows, 42)
+
+    monkeypatch.setitem(BACKENDS, "constant", BACKENDS["numpy"])
+    register_backend(ConstantBackend())
+
+    assert np.all(make_simulator(num_sim=1000).run_simulation(engine="constant") == 42)
+
+
+def test_register_rejects_unnamed_backend():
+
+    class UnnamedBackend(SimulationBackend):
+
+        def simulate(self, simulator, rng, num_rows, block_weeks, max_weeks):
+            return np.ones(num_rows)
+
+    with pytest.raises(TypeError):
+        register_backend(UnnamedBackend())
+    with pytest.raises(TypeError):
+        SimulationBackend()  # simulate is abstract
+
+
+def test_unknown_engine_lists_every_engine():
+
+    with pytest.raises(ValueError, match="analytic"):
+        get_backend("quantum")
+    with pytest.raises(ValueError, match="run_simulation"):
+        get_backend("analytic")
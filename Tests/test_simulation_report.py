@@ -0,0 +1,67 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from classes.simulation_report import SimulationReport
+from classes.simulation_visualizer import SimulationVisualizer
+from classes.completion_histogram import CompletionHistogram
+
+
+@pytest.fixture
+def weeks():
+    return np.random.default_rng(4).integers(20, 40, size=2000)
+
+
+def test_reports_in_parallel_write_no_temporary_files(weeks, tmp_path, monkeypatch):
+
+    monkeypatch.chdir(tmp_path)
+    paths = [str(tmp_path / f"report_{i}.pdf") for i in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda path: SimulationReport(weeks).generate_pdf(path), paths))
+
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in paths)
+    for path in paths:
+        with open(path, "rb") as f:
+            assert f.read(5) == b"%PDF-"
+
+
+def test_report_in_memory_and_vector(weeks):
+
+    report = SimulationReport(weeks)
+    images = report.render_images("svg")
+    assert list(images) == ["Histogram", "CDF", "Boxplot", "Convergence"]
+    assert all(b"<svg" in image for image in images.values())
+    assert report.generate_pdf(None, image_format="svg").startswith(b"%PDF-")
+
+    with pytest.raises(ValueError):
+        report.render_images("data")
+
+
+def test_boxplot_stats_match_matplotlib(weeks):
+
+    from matplotlib.cbook import boxplot_stats
+
+    expected = boxplot_stats(weeks)[0]
+    data = SimulationVisualizer(weeks).plot_boxplot(format="data")
+    for key in ("q1", "med", "q3", "whislo", "whishi", "mean"):
+        assert data[key] == pytest.approx(expected[key])
+    assert data["fliers"] == sorted(set(expected["fliers"].tolist()))
+    assert SimulationVisualizer(weeks).plot_boxplot(encoded=False).startswith(b"\x89PNG")
+
+
+def test_plots_and_report_from_a_histogram(weeks):
+
+    histogram = CompletionHistogram.from_results(weeks)
+    for kind in ("histogram", "cdf", "boxplot"):
+        from_histogram = SimulationVisualizer(histogram).plot(kind, format="data")
+        from_results = SimulationVisualizer(weeks).plot(kind, format="data")
+        assert list(from_histogram) == list(from_results)
+        for key, value in from_results.items():
+            assert from_histogram[key] == pytest.approx(value)
+
+    with pytest.raises(ValueError):
+        SimulationVisualizer(histogram).plot_convergence(format="data")
+
+    report = SimulationReport(histogram)
+    assert list(report.render_images("svg")) == ["Histogram", "CDF", "Boxplot"]
+    assert report.summary_stats() == pytest.approx(SimulationReport(weeks).summary_stats())
@@ -0,0 +1,270 @@
+import tracemalloc
+import numpy as np
+import pytest
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.simulator import Simulator, compact_weeks
+
+
+def make_simulator(backlog=150, num_sim=2000, risks=None, **kwargs):
+
+    params = SimulationParameters(backlog=backlog, th_min=3, th_ex=5, th_max=9, num_sim=num_sim)
+    if risks is None:
+        risks = [Risk("Dependencies", 0.3, 0.7)]
+    return Simulator(params, risks, **kwargs)
+
+
+def test_run_simulation_happypath():
+
+    sim = make_simulator(seed=7)
+    results = sim.run_simulation()
+
+    assert results.shape == (2000,)
+    assert results.min() >= 150 // 9 #can't finish faster than at th_max every week
+    assert np.array_equal(sim.get_results(), results)
+
+
+def test_horizon_extends_past_old_cap():
+
+    results = make_simulator(backlog=2000, seed=7).run_simulation()
+
+    #with the old fixed 150 weeks these replicas would have been reported as week 1
+    assert results.min() > 150
+
+
+@pytest.mark.parametrize("block_weeks", [1, 7, 500])
+def test_block_size_does_not_change_the_distribution(block_weeks):
+
+    reference = make_simulator(num_sim=20000, seed=11).run_simulation()
+    results = make_simulator(num_sim=20000, seed=12).run_simulation(block_weeks=block_weeks)
+
+    assert abs(np.percentile(results, 85) - np.percentile(reference, 85)) <= 1
+    assert abs(results.mean() - reference.mean()) < 0.3
+
+
+def test_max_weeks_cap_raises():
+
+    with pytest.raises(RuntimeError):
+        make_simulator(backlog=2000).run_simulation(max_weeks=150)
+
+
+def test_chunked_run_stays_within_memory_budget():
+
+    sim = make_simulator(num_sim=200000, memory_budget_mb=4, seed=3)
+
+    tracemalloc.start()
+    results = sim.run_simulation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert results.shape == (200000,)
+    assert peak < 4 * 1024 ** 2 + 3 * results.nbytes #budget plus the integer results
+
+
+@pytest.mark.parametrize("budget", [0, -1, None])
+def test_invalid_memory_budget(budget):
+
+    with pytest.raises(ValueError):
+        make_simulator(memory_budget_mb=budget)
+
+
+def reference_run(params, risks, max_weeks=400):
+
+    """The original full-matrix simulation, kept here as the semantics reference."""
+    th_base = np.random.triangular(params.th_min, params.th_ex, params.th_max, size=(params.num_sim, max_weeks))
+    adjusted = th_base.copy()
+    for risk in risks:
+        risk_mask = np.random.rand(*th_base.shape) < risk.probability
+        adjusted = np.where(risk_mask, adjusted * risk.impact, adjusted)
+    return np.argmax(np.cumsum(adjusted, axis=1) >= params.backlog, axis=1) + 1
+
+
+def test_fused_risk_kernel_matches_cumulative_semantics():
+
+    risks = [Risk("Vacations", 0.2, 0.5), Risk("Dependencies", 0.3, 0.7), Risk("Rework", 0.1, 0.9)]
+    sim = make_simulator(risks=risks, seed=5)
+
+    multipliers = sim._apply_risks(np.ones((400000, 1)), np.random.default_rng(5)).ravel()
+
+    #every subset of risks hitting the same week multiplies all their impacts
+    for hits in np.ndindex(2, 2, 2):
+        value = np.prod([r.impact if hit else 1.0 for r, hit in zip(risks, hits)])
+        expected = np.prod([r.probability if hit else 1 - r.probability for r, hit in zip(risks, hits)])
+        observed = np.isclose(multipliers, value).mean()
+        assert abs(observed - expected) < 0.005
+
+
+@pytest.mark.parametrize("precision", ["float64", "float32"])
+def test_fused_simulation_matches_reference(precision):
+
+    risks = [Risk("Vacations", 0.2, 0.5), Risk("Dependencies", 0.3, 0.7), Risk("Rework", 0.1, 0.9)]
+    sim = make_simulator(num_sim=40000, risks=risks, precision=precision, seed=9)
+    results = sim.run_simulation()
+
+    np.random.seed(9)
+    reference = reference_run(sim.parameters, risks)
+
+    for p in (50, 85, 95):
+        assert abs(np.percentile(results, p) - np.percentile(reference, p)) <= 1
+    assert abs(results.mean() - reference.mean()) < 0.3
+
+
+def test_seed_makes_runs_reproducible():
+
+    first = make_simulator(seed=21).run_simulation()
+    second = make_simulator(seed=21).run_simulation()
+
+    assert np.array_equal(first, second)
+
+
+def test_same_seed_gives_identical_results_for_any_worker_count():
+
+    serial = make_simulator(num_sim=120000, seed=33).run_simulation(workers=1)
+    parallel = make_simulator(num_sim=120000, seed=33).run_simulation(workers=3)
+
+    assert np.array_equal(serial, parallel)
+
+
+def test_shards_use_independent_streams():
+
+    results = make_simulator(num_sim=2 * Simulator.SHARD_SIZE, seed=33).run_simulation()
+
+    assert not np.array_equal(results[:Simulator.SHARD_SIZE], results[Simulator.SHARD_SIZE:])
+
+
+def test_analytic_engine_matches_sampling():
+
+    risks = [Risk("Vacations", 0.2, 0.5), Risk("Dependencies", 0.3, 0.7)]
+    sim = make_simulator(num_sim=100000, risks=risks, seed=4)
+    sampled = sim.run_simulation()
+    exact = sim.run_simulation(engine="analytic")
+
+    weeks, probabilities = sim.completion_distribution()
+    empirical_cdf = np.searchsorted(np.sort(sampled), weeks, side="right") / sampled.size
+
+    assert np.isclose(probabilities.sum(), 1.0)
+    assert np.abs(np.cumsum(probabilities) - empirical_cdf).max() < 0.01
+    for p in (50, 85, 95):
+        assert abs(np.percentile(exact, p) - np.percentile(sampled, p)) <= 1
+
+
+def test_analytic_engine_converges_with_grid_resolution():
+
+    sim = make_simulator()
+    _, reference = sim.completion_distribution(grid_points=800)
+
+    errors = []
+    for grid_points in (5, 20, 100):
+        _, probabilities = sim.completion_distribution(grid_points=grid_points)
+        size = min(probabilities.size, reference.size)
+        errors.append(np.abs(np.cumsum(probabilities[:size]) - np.cumsum(reference[:size])).max())
+
+    assert errors[0] > errors[1] > errors[2]
+    assert errors[2] < 0.005
+
+
+@pytest.mark.parametrize("sampling", ["antithetic", "lhs", "sobol"])
+def test_sampling_modes_match_the_exact_distribution(sampling):
+
+    if sampling == "sobol":
+        pytest.importorskip("scipy")
+
+    sim = make_simulator(num_sim=20000, seed=8, sampling=sampling)
+    results = sim.run_simulation()
+    exact = sim.run_simulation(engine="analytic")
+
+    for p in (50, 85, 95):
+        assert abs(np.percentile(results, p) - np.percentile(exact, p)) <= 1
+
+
+def test_antithetic_and_lhs_uniforms():
+
+    rng = np.random.default_rng(1)
+    uniforms = np.empty((1000, 6))
+
+    Simulator._draw_uniforms(rng, uniforms, "antithetic")
+    assert np.allclose(uniforms[:500] + uniforms[500:], 1.0)
+
+    Simulator._draw_uniforms(rng, uniforms, "lhs")
+    for week in range(6): #exactly one replica per 1/1000 slice
+        assert np.array_equal(np.sort(np.floor(uniforms[:, week] * 1000)), np.arange(1000))
+
+
+def test_run_until_precision_reaches_target():
+
+    sim = make_simulator(backlog=1000, num_sim=1000, seed=2)
+    report = sim.run_until_precision(target_half_width=0.5, percentile=85, batch_size=100)
+
+    assert report["target_reached"]
+    assert report["half_width"] <= 0.5
+    assert report["ci_low"] <= report["estimate"] <= report["ci_high"]
+    assert report["num_sim"] == report["results"].size > 100
+    assert np.array_equal(sim.get_results(), report["results"])
+
+
+def test_run_until_precision_stops_at_budget():
+
+    sim = make_simulator(backlog=1000, num_sim=1000, seed=2)
+    report = sim.run_until_precision(target_half_width=0.01, batch_size=1000, max_sim=3000)
+
+    assert not report["target_reached"]
+    assert report["num_sim"] == 3000
+
+
+def test_invalid_sampling():
+
+    with pytest.raises(ValueError):
+        make_simulator(sampling="stratified")
+
+
+def test_invalid_engine():
+
+    with pytest.raises(ValueError):
+        make_simulator().run_simulation(engine="quantum")
+
+
+def test_analytic_engine_only_runs_whole_simulations():
+
+    with pytest.raises(ValueError, match="analytic"):
+        make_simulator().run_until_precision(engine="analytic")
+    with pytest.raises(ValueError, match="analytic"):
+        make_simulator().run_streaming(1000, engine="analytic")
+
+
+@pytest.mark.parametrize("engine", ["numpy", "analytic"])
+def test_float32_policy_returns_uint16_weeks(engine):
+
+    results = make_simulator(precision="float32", seed=1).run_simulation(engine=engine)
+    reference = make_simulator(seed=1).run_simulation(engine=engine)
+
+    assert results.dtype == np.uint16
+    assert reference.dtype == np.int64
+    assert abs(np.percentile(results, 85) - np.percentile(reference, 85)) <= 1
+
+
+def test_compact_weeks_promotes_instead_of_overflowing():
+
+    assert compact_weeks(np.array([1, 65535]), np.uint16).dtype == np.uint16
+    assert compact_weeks(np.array([1, 70000]), np.uint16).dtype == np.uint32
+    assert compact_weeks(np.array([1, 70000]), np.uint16)[1] == 70000
+
+
+def test_invalid_precision():
+
+    with pytest.raises(ValueError):
+        make_simulator(precision="float16")
+
+
+def test_results_before_run():
+
+    with pytest.raises(RuntimeError):
+        make_simulator().get_results()
+
+
+def test_run_until_precision_with_bootstrap_intervals():
+
+    sim = make_simulator(backlog=1000, num_sim=1000, seed=2)
+    report = sim.run_until_precision(target_half_width=0.5, batch_size=100, interval="bootstrap")
+
+    assert report["target_reached"]
+    assert report["ci_low"] <= report["estimate"] <= report["ci_high"]
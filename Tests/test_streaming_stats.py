@@ -0,0 +1,79 @@
+import json
+import numpy as np
+import pytest
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.simulator import Simulator
+from classes.streaming_stats import KLLSketch, RunningMoments, StreamingStats
+
+
+def test_sketch_quantiles_stay_within_the_rank_error():
+
+    values = np.random.default_rng(2).gamma(3.0, 10.0, size=200_000)
+    sketch = KLLSketch(k=200, seed=1)
+    for batch in np.array_split(values, 40):
+        sketch.update(batch)
+
+    ranked = np.sort(values)
+    for q in (0.05, 0.5, 0.85, 0.95):
+        rank = np.searchsorted(ranked, sketch.quantile(q)) / values.size
+        assert abs(rank - q) <= sketch.rank_error()
+    assert sketch.size() < 4 * sketch.k
+
+
+def test_small_streams_are_exact():
+
+    sketch = KLLSketch(k=200)
+    sketch.update(np.arange(1, 101))
+
+    assert sketch.quantile(0.5) == 50
+    assert sketch.quantile(1.0) == 100
+
+
+def test_running_moments_match_numpy_and_merge():
+
+    values = np.random.default_rng(3).normal(40, 5, size=10_001)
+    first, second = RunningMoments(), RunningMoments()
+    first.update(values[:3000])
+    second.update(values[3000:])
+    moments = first.merge(second)
+
+    assert moments.count == values.size
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.std(ddof=1) == pytest.approx(values.std(ddof=1))
+    assert (moments.min, moments.max) == (values.min(), values.max())
+
+
+def test_merged_sketches_answer_for_both_streams():
+
+    rng = np.random.default_rng(4)
+    low, high = StreamingStats(), StreamingStats()
+    low.update(rng.uniform(0, 1, 50_000))
+    high.update(rng.uniform(1, 2, 50_000))
+    merged = low.merge(high)
+
+    assert merged.num_sim == 100_000
+    assert abs(merged.percentile(50) - 1.0) < 0.03
+    assert merged.mean() == pytest.approx(1.0, abs=0.01)
+
+
+def make_simulator():
+
+    params = SimulationParameters(backlog=150, th_min=3, th_ex=5, th_max=9, num_sim=2000)
+    return Simulator(params, [Risk("Dependencies", 0.3, 0.7)], seed=6)
+
+
+def test_simulator_feeds_batches_and_resumes_from_a_checkpoint():
+
+    whole = make_simulator().run_streaming(num_sim=8000)
+
+    checkpoints = []
+    make_simulator().run_streaming(num_sim=4000, on_batch=lambda stats: checkpoints.append(json.dumps(stats.to_dict())))
+    resumed = make_simulator().run_streaming(num_sim=4000, stats=StreamingStats.from_dict(json.loads(checkpoints[-1])))
+
+    assert len(checkpoints) == 2
+    assert resumed.num_sim == whole.num_sim == 8000
+    assert resumed.to_dict() == whole.to_dict()
+
+    reference = make_simulator().run_simulation()
+    assert abs(whole.percentile(85) - np.percentile(reference, 85)) <= 1
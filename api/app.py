@@ -1,20 +1,47 @@
 
-from typing import List
-import numpy as np
-from fastapi import FastAPI, HTTPException
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
 
 #DTOs
-from api.schemas import (ParamsDTO, RiskDTO,
-    RunRequest, RunResponse, ErrorResponse, ImageDTO,
+from api.schemas import (
+    RunRequest, RunResponse, ErrorResponse, JobRequest, JobResponse,
 )
+from api.service import map_params, map_risks, request_key, run_simulation, run_simulation_job
 
 #domain clases
-from src.classes.simulator import Simulator
-from src.classes.simulation_visualizer import SimulationVisualizer
-from src.classes.simulation_params import SimulationParameters
-from src.classes.risk_class import Risk
+from src.classes.byte_cache import ByteCache
+from src.classes.render_pipeline import RenderPipeline, warm_up
+from src.classes.job_queue import create_queue
 
-app = FastAPI(title="Monte Carlo Simulation API", version="0.1.0")
+#warm pool that renders the plots of a request concurrently
+RENDER_PIPELINE = RenderPipeline(workers=int(os.environ.get("RENDER_WORKERS", 3)))
+
+#background simulations (/jobs), run in their own bounded process pool
+JOB_QUEUE = create_queue(
+    os.environ.get("JOB_QUEUE", "local"),
+    workers=int(os.environ.get("JOB_WORKERS", 2)),
+    max_queued=int(os.environ.get("JOB_MAX_QUEUED", 1000)),
+    initializer=warm_up,  # matplotlib ready in every worker
+)
+#iterations x backlog up to this is a small job: high priority unless the request says otherwise
+SMALL_JOB_WORK = int(os.environ.get("SMALL_JOB_WORK", 2_000_000))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    RENDER_PIPELINE.start()  # workers are ready before the first request
+    JOB_QUEUE.start()
+    yield
+    JOB_QUEUE.shutdown()
+    RENDER_PIPELINE.shutdown()
+
+app = FastAPI(title="Monte Carlo Simulation API", version="0.1.0", lifespan=lifespan)
+
+#rendered plots keyed by results + plot options, shared by every request
+RENDER_CACHE = ByteCache(
+    max_bytes=int(os.environ.get("RENDER_CACHE_BYTES", 64 * 1024 ** 2)),
+    disk_dir=os.environ.get("RENDER_CACHE_DIR"),  # optional on-disk tier
+)
 
 #---------- test routes ----------
 @app.get("/")
@@ -22,22 +49,19 @@ def root():
     return {"hello": "world"}
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
-
-#---------- mapping DTO -> domain ----------
-def map_params(dto: ParamsDTO) -> SimulationParameters:
-    return SimulationParameters(
+async def health():
+    return {"status": "ok"}  # async: answered on the event loop, never waits for the threadpool
 
-        backlog=dto.backlog,
-        th_min=dto.t_min,
-        th_ex=dto.t_mode,   # <- antes tenías th_ex
-        th_max=dto.t_max,
-        num_sim=dto.iterations,
-    )
+#serialized responses of /simulate keyed by request_key, for dashboards that repeat requests
+RESULT_CACHE = ByteCache(
+    max_bytes=int(os.environ.get("RESULT_CACHE_BYTES", 256 * 1024 ** 2)),
+    disk_dir=os.environ.get("RESULT_CACHE_DIR"),  # optional on-disk tier
+    ttl=float(os.environ.get("RESULT_CACHE_TTL", 3600)),
+)
 
-def map_risks(dtos: list[RiskDTO]) -> list[Risk]:
-    return [Risk(risk_name=r.name, probability=r.probability, impact=r.impact) for r in dtos]
+@app.get("/cache")
+def cache_stats():
+    return {"render": RENDER_CACHE.stats(), "results": RESULT_CACHE.stats()}
 
 @app.post(
     "/simulate",
@@ -45,33 +69,59 @@ def map_risks(dtos: list[RiskDTO]) -> list[Risk]:
     responses={400: {"model": ErrorResponse}, 422: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
 )
 def simulate(req: RunRequest) -> RunResponse:
+    #a repeated request gets the stored JSON as is: no simulation, rendering or serialization
+    key = request_key(req)
+    body = RESULT_CACHE.get(key)
+    if body is not None:
+        return Response(body, media_type="application/json", headers={"X-Cache": "hit"})
+
     try:
-        params_domain = map_params(req.params)
-        risks_domain  = map_risks(req.risks)
-
-        sim = Simulator(       
-            parameters=params_domain,        
-            risks=risks_domain,
-        )
-
-        results: np.ndarray = sim.run_simulation() 
-
-        viz = SimulationVisualizer(results)
-        hist_b64 = viz._plot_histogram() 
-        cfd_b64  = viz.plot_cdf()
-        convergence_b64 = viz.plot_convergence()
-
-        return RunResponse(
-        
-            images=[
-                ImageDTO(kind="histogram", image_base64=hist_b64),
-                ImageDTO(kind="cdf", image_base64=cfd_b64),
-                ImageDTO(kind="convergence", image_base64=convergence_b64)
-            ]
-        )
+        body = run_simulation(req, cache=RENDER_CACHE, pipeline=RENDER_PIPELINE).model_dump_json().encode()
+        RESULT_CACHE.put(key, body)
+        return Response(body, media_type="application/json", headers={"X-Cache": "miss"})
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail={"error": "bad_request", "message": str(e), "fields": None})
     except Exception as e:
         import traceback; traceback.print_exc()  #helps with error tracking
         raise HTTPException(status_code=500, detail={"error": "server_error", "message": f"Unexpected error: {type(e).__name__}", "fields": None})
+
+#---------- background jobs ----------
+def job_response(job_id: str, job) -> JobResponse:
+    if job is None:
+        raise HTTPException(status_code=404, detail={"error": "not_found", "message": f"Job {job_id} not found", "fields": None})
+    return JobResponse.model_validate(job.to_dict())
+
+@app.post(
+    "/jobs",
+    status_code=202,
+    response_model=JobResponse,
+    responses={400: {"model": ErrorResponse}, 422: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+async def create_job(req: JobRequest) -> JobResponse:
+    try:
+        map_params(req.params)  # domain errors are reported now, not by the job
+        map_risks(req.risks)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail={"error": "bad_request", "message": str(e), "fields": None})
+
+    priority = req.priority
+    if priority is None:
+        priority = "high" if req.params.iterations * req.params.backlog <= SMALL_JOB_WORK else "normal"
+    try:
+        job = JOB_QUEUE.submit(run_simulation_job, req.model_dump(exclude={"priority"}), priority=priority)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail={"error": "unavailable", "message": str(e), "fields": None})
+    return job_response(job.id, job)
+
+@app.get("/jobs/{job_id}", response_model=JobResponse, responses={404: {"model": ErrorResponse}})
+async def get_job(job_id: str) -> JobResponse:
+    return job_response(job_id, JOB_QUEUE.get(job_id))
+
+@app.delete("/jobs/{job_id}", response_model=JobResponse, responses={404: {"model": ErrorResponse}})
+async def cancel_job(job_id: str) -> JobResponse:
+    return job_response(job_id, JOB_QUEUE.cancel(job_id))
+
+@app.get("/jobs")
+async def job_stats():
+    return JOB_QUEUE.stats()
@@ -42,6 +42,16 @@ class RunRequest(BaseModel):
 
     params: ParamsDTO
     risks: list[RiskDTO] = Field(default_factory=list)
+    format: Literal["png", "svg", "data"] = Field("png", description="png (base64), svg (text) or data (arrays for the frontend to draw).")
+    seed: int | None = Field(None, ge=0, description="same request + seed gives the same results (random seed if missing).")
+
+
+class JobRequest(RunRequest):
+
+    """Run the simulation in the background (POST /jobs)"""
+
+    priority: Literal["high", "normal", "low"] | None = Field(
+        None, description="high jobs start first; by default small runs are high and big ones normal.")
 
 
 #plts on demand
@@ -73,28 +83,57 @@ class VisualizeRequest(BaseModel):
 
 #Responses (public)
 class ImageDTO(BaseModel):
+
+    """One plot: image_base64 for png, svg for svg, data for data (the other fields are None)."""
+
     kind: Literal["histogram", "cdf", "boxplot", "convergence"]
-    image_base64: str
+    format: Literal["png", "svg", "data"] = "png"
+    image_base64: str | None = None
+    svg: str | None = None
+    data: dict | None = None
+
+    @classmethod
+    def from_plot(cls, kind: str, image_format: str, image: str | dict) -> "ImageDTO":
+        field = {"png": "image_base64", "svg": "svg", "data": "data"}[image_format]
+        return cls(kind=kind, format=image_format, **{field: image})
 
 
 class RunResponse(BaseModel):
     
     images: list[ImageDTO] = Field(default_factory=list)
+    stats: dict[str, float] = Field(default_factory=dict, description="count, mean, std, min, quartiles, max, p50, p85, p95.")
+    seed: int | None = Field(None, description="seed used, send it back to reproduce the run.")
 
     model_config = ConfigDict(json_schema_extra={
         "example": {
         "results": [45.0, 23.0, 34.0, 32.0, 26.0],
-        "images": [{"kind": "histogram", "image_base64": "<BASE64...>"}]
+        "images": [{"kind": "histogram", "image_base64": "<BASE64...>"}],
+        "stats": {"mean": 32.0, "p85": 40.0},
+        "seed": 42
         }
     })
 
 
+class JobResponse(BaseModel):
+
+    """State of a background job; result is set once status is done."""
+
+    id: str
+    status: Literal["queued", "running", "done", "failed", "cancelled"]
+    priority: Literal["high", "normal", "low"]
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: RunResponse | None = None
+    error: str | None = None
+
+
 class VisualizeResponse(BaseModel):
     images: list[ImageDTO]
 
 # Error contract
 
 class ErrorResponse(BaseModel):
-    error: Literal["validation_error", "bad_request", "server_error"]
+    error: Literal["validation_error", "bad_request", "not_found", "unavailable", "server_error"]
     message: str
     fields: dict[str, str] | None = None
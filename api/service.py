@@ -0,0 +1,84 @@
+#simulation of a RunRequest, shared by /simulate and the job workers
+import numpy as np
+
+from api.schemas import ParamsDTO, RiskDTO, RunRequest, RunResponse, ImageDTO
+
+#domain clases
+from src.classes.byte_cache import content_key
+from src.classes.simulation_analyzer import SimulationAnalyzer
+from src.classes.simulator import Simulator
+from src.classes.simulation_visualizer import SimulationVisualizer
+from src.classes.simulation_params import SimulationParameters
+from src.classes.risk_class import Risk
+
+PLOTS = ("histogram", "cdf", "convergence")
+#everything besides the request that shapes a response, part of the request key
+ENGINE_OPTIONS = {"precision": "float32", "plots": PLOTS, "version": 1}
+
+#---------- mapping DTO -> domain ----------
+def map_params(dto: ParamsDTO) -> SimulationParameters:
+    return SimulationParameters(
+
+        backlog=dto.backlog,
+        th_min=dto.t_min,
+        th_ex=dto.t_mode,   # <- antes tenías th_ex
+        th_max=dto.t_max,
+        num_sim=dto.iterations,
+    )
+
+def map_risks(dtos: list[RiskDTO]) -> list[Risk]:
+    return [Risk(risk_name=r.name, probability=r.probability, impact=r.impact) for r in dtos]
+
+def canonical_risks(dtos: list[RiskDTO]) -> list[RiskDTO]:
+    """Risks in a fixed order, so a reordered list is the same request (and the same results)."""
+    return sorted(dtos, key=lambda r: (r.name, r.probability, r.impact))
+
+def request_key(req: RunRequest) -> str:
+    """
+    Hash of the normalized request (validated params, risks in canonical order, seed,
+    format) and the engine options: equal keys give equal responses when seeded.
+    """
+    canonical = {
+        "params": req.params.model_dump(),
+        "risks": [[r.name, float(r.probability), float(r.impact)] for r in canonical_risks(req.risks)],
+        "seed": req.seed,
+        "format": req.format,
+    }
+    return content_key("run", canonical, ENGINE_OPTIONS)
+
+def run_simulation(req: RunRequest, cache=None, pipeline=None) -> RunResponse:
+    """
+    Simulates the request and renders its plots (in pipeline if given, else one after
+    another). Raises ValueError/TypeError for inputs the domain rejects.
+    """
+    seed = req.seed if req.seed is not None else int(np.random.SeedSequence().generate_state(1)[0])
+    sim = Simulator(
+        parameters=map_params(req.params),
+        risks=map_risks(canonical_risks(req.risks)),
+        precision=ENGINE_OPTIONS["precision"],  # float32 matrices and uint16 weeks, see Simulator PRECISIONS
+        seed=seed,
+    )
+
+    results: np.ndarray = sim.run_simulation()
+    analyzer = SimulationAnalyzer(results)
+    stats = {**analyzer.describe(), **analyzer.percentiles(percentiles=(0.5, 0.85, 0.95))}
+
+    viz = SimulationVisualizer(results, cache=cache)
+    options = {"format": req.format}
+    if pipeline is not None:
+        images = pipeline.render(viz, {kind: options for kind in PLOTS})  # concurrent, cache aware
+    else:
+        images = {kind: viz.plot(kind, **options) for kind in PLOTS}
+
+    return RunResponse(
+        images=[ImageDTO.from_plot(kind, req.format, image) for kind, image in images.items()],
+        stats=stats,
+        seed=seed,
+    )
+
+def run_simulation_job(request: dict) -> dict:
+    """
+    Job worker entry point: RunRequest as a dict in, RunResponse as a dict out (both
+    cross the process boundary).
+    """
+    return run_simulation(RunRequest.model_validate(request)).model_dump()
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.simulator import Simulator
+from classes.simulation_backends import BACKENDS
+
+"""
+Time and traced memory of every simulation backend for a few problem sizes.
+The first call of a compiled backend is reported apart, since it includes the compilation.
+"""
+
+CASES = [
+    ("small", 150, 10_000),
+    ("large backlog", 2000, 10_000),
+    ("many replicas", 150, 500_000),
+]
+risks = [Risk("Dependencies", 0.3, 0.7), Risk("Vacations", 0.05, 0.5), Risk("Rework", 0.1, 0.9)]
+
+
+def measure(engine, backlog, num_sim):
+    simulator = Simulator(SimulationParameters(backlog, 3, 5, 9, num_sim), risks, seed=1)
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = simulator.run_simulation(engine=engine)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, np.percentile(results, 85)
+
+
+if __name__ == "__main__":
+
+    print(f"{'Case':<14} | {'Engine':<7} | {'Time':>7} | {'Peak MB':>8} | {'P85':>5}")
+    print("-" * 53)
+
+    for engine, backend in BACKENDS.items():
+        if not backend.is_available():
+            print(f"{'':<14} | {engine:<7} | skipped: not installed")
+            continue
+        warmup, _, _ = measure(engine, 150, 100)
+        print(f"{'first call':<14} | {engine:<7} | {warmup:6.3f}s | {'':>8} | {'':>5}")
+        for name, backlog, num_sim in CASES:
+            elapsed, peak, p85 = measure(engine, backlog, num_sim)
+            print(f"{name:<14} | {engine:<7} | {elapsed:6.3f}s | {peak / 1024 ** 2:8.1f} | {p85:5.0f}")
@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.simulator import Simulator
+from classes.simulation_report import SimulationReport
+from classes.batch_report import BatchReportGenerator
+
+"""
+Weekly reports of SCENARIOS projects: one Simulator + SimulationReport per project (the
+old way) against BatchReportGenerator, serial and with a warm process pool, one PDF per
+scenario and combined. Prints the per-stage totals of the generator.
+"""
+
+SCENARIOS = 200
+rng = np.random.default_rng(0)
+scenarios = {}
+for i in range(SCENARIOS):
+    th_min = int(rng.integers(1, 4))
+    params = SimulationParameters(int(rng.integers(40, 200)), th_min, th_min + 2, th_min + 5, 2000)
+    scenarios[f"project-{i:03d}"] = (params, [Risk("Dependencies", 0.3, 0.5), Risk("Rework", 0.1, 0.3)])
+
+
+if __name__ == "__main__":
+
+    print(f"{os.cpu_count()} cores, {SCENARIOS} scenarios")
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        for name, (params, risks) in scenarios.items():
+            results = Simulator(params, risks, precision="float32").run_simulation()
+            SimulationReport(results).generate_pdf(os.path.join(folder, f"old-{name}.pdf"))
+        print(f"{'one report per call':<24} | {time.perf_counter() - start:7.2f}s")
+
+        for workers in (1, 4):
+            for combined in (False, True):
+                generator = BatchReportGenerator(scenarios, seed=1, workers=workers)
+                output = os.path.join(folder, "all.pdf" if combined else f"batch-{workers}")
+                result = generator.generate(output, combined=combined)
+                label = f"{workers} workers, {'combined' if combined else 'per scenario'}"
+                stages = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in result["totals"].items())
+                print(f"{label:<24} | {result['wall']:7.2f}s  ({stages})")
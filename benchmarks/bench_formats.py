@@ -0,0 +1,47 @@
+import json
+import os
+import sys
+import time
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from classes.simulation_visualizer import SimulationVisualizer
+
+"""
+Payload size and latency of the /simulate images per format: the three plots rendered
+(no cache) and serialized to the JSON the API sends, for png (base64), svg and data.
+"""
+
+PLOTS = ("histogram", "cdf", "convergence")
+REPEATS = 5
+
+
+def best_of(function):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def payload(visualizer, image_format):
+    images = [{"kind": kind, "format": image_format, **{
+        {"png": "image_base64", "svg": "svg", "data": "data"}[image_format]: visualizer.plot(kind, format=image_format)
+    }} for kind in PLOTS]
+    return json.dumps({"images": images})
+
+
+if __name__ == "__main__":
+
+    for num_sim in (2_000, 200_000):
+        results = np.random.default_rng(1).binomial(60, 0.5, size=num_sim) + 10
+        visualizer = SimulationVisualizer(results)
+        visualizer.plot_cdf() #warm matplotlib up
+
+        print(f"\n{num_sim} replicas")
+        print(f"{'format':<8} | {'payload':>10} | {'latency':>8}")
+        for image_format in ("png", "svg", "data"):
+            size = len(payload(visualizer, image_format).encode())
+            seconds = best_of(lambda: payload(visualizer, image_format))
+            print(f"{image_format:<8} | {size / 1024:8.1f}KB | {seconds:7.3f}s")
@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+
+"""
+Cold-start cost of the entry points: `python -X importtime -c "import <module>"` in a
+fresh interpreter, best of a few runs. Prints the total, the slowest modules and any
+heavy module (matplotlib, pandas, fpdf, scipy) that got imported eagerly.
+With --check it exits with 1 if a target is over its budget or imports a heavy module.
+Tests/test_import_budget.py only runs the heavy module check (heavy_imports), timings
+depend too much on the machine for the unit suite.
+"""
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+#target -> (working directory, module, budget in ms). The budgets leave room for slower
+#machines: fastapi + pydantic alone are about 450ms of api.app, numpy about 60ms, and
+#an eager matplotlib would add 200-400ms (it's also caught by the HEAVY check).
+TARGETS = {
+    "api.app": (ROOT, "api.app", 1000),
+    "src.classes.simulator": (ROOT, "src.classes.simulator", 250),
+    "legacy main": (os.path.join(ROOT, "legacySimulator"), "main", 250),
+    "legacy sensitivity": (os.path.join(ROOT, "legacySimulator"), "sensitivy_analysis.sensitivity", 250),
+}
+HEAVY = ("matplotlib", "pandas", "fpdf", "scipy")
+REPEATS = 3
+
+
+def measure(target: str, repeats: int = REPEATS) -> dict:
+    """
+    {"total_ms", "slowest": [(module, self ms)], "heavy": [heavy modules imported]} of
+    the fastest of repeats cold imports of target.
+    """
+    folder, module, _ = TARGETS[target]
+    best = None
+    for _ in range(repeats):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=folder,
+                                   capture_output=True, text=True, check=True,
+                                   env={**os.environ, "PYTHONPATH": folder, "PYTHONDONTWRITEBYTECODE": "1"})
+        rows = []
+        for line in completed.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line and "self [us]" not in line:
+                self_us, cumulative_us, name = line[len("import time:"):].split("|")
+                rows.append((name.strip(), int(self_us), int(cumulative_us), len(name) - len(name.lstrip())))
+        #top level imports (the least indented) add up to the whole cost
+        top = min(indent for _, _, _, indent in rows)
+        total_ms = sum(cumulative for _, _, cumulative, indent in rows if indent == top) / 1000
+        if best is None or total_ms < best["total_ms"]:
+            best = {
+                "total_ms": total_ms,
+                "slowest": [(name, self_us / 1000) for name, self_us, _, _ in sorted(rows, key=lambda row: -row[1])[:5]],
+                "heavy": sorted({name.split(".")[0] for name, _, _, _ in rows if name.split(".")[0] in HEAVY}),
+            }
+    return best
+
+
+def heavy_imports(target: str) -> list[str]:
+    """
+    Heavy modules in sys.modules after a fresh `import <module>` of target.
+    """
+    folder, module, _ = TARGETS[target]
+    code = f"import sys, {module}; print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}} & set({HEAVY!r}))))"
+    completed = subprocess.run([sys.executable, "-c", code], cwd=folder, capture_output=True, text=True, check=True,
+                               env={**os.environ, "PYTHONPATH": folder})
+    return completed.stdout.split()
+
+
+def check(target: str, repeats: int = REPEATS) -> list[str]:
+    """
+    Budget violations of target (empty if it's within budget).
+    """
+    return problems(target, measure(target, repeats))
+
+
+def problems(target: str, measured: dict) -> list[str]:
+    budget = TARGETS[target][2]
+    found = [f"{target} imports {module} eagerly" for module in measured["heavy"]]
+    if measured["total_ms"] > budget:
+        found.append(f"{target} takes {measured['total_ms']:.0f}ms to import, budget {budget}ms")
+    return found
+
+
+if __name__ == "__main__":
+
+    violations = []
+    for target in TARGETS:
+        measured = measure(target)
+        budget = TARGETS[target][2]
+        print(f"{target:<22} | {measured['total_ms']:7.1f}ms (budget {budget}ms) | heavy: {', '.join(measured['heavy']) or '-'}")
+        for name, self_ms in measured["slowest"]:
+            print(f"{'':<22} |   {name:<40} {self_ms:6.1f}ms")
+        violations += problems(target, measured)
+
+    if "--check" in sys.argv and violations:
+        print("\n".join(violations))
+        sys.exit(1)
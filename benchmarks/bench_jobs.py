@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+import time
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+from api.app import app
+
+"""
+Latency of small requests while big simulations run: /health and a small simulation,
+idle, next to two big synchronous /simulate calls (threadpool + GIL) and next to two
+big /jobs (process pool, the small job gets the reserved high priority worker).
+"""
+
+SMALL = {"params": {"backlog": 60, "t_min": 2, "t_mode": 4, "t_max": 7, "iterations": 2000}, "format": "data"}
+BIG = {"params": {"backlog": 3000, "t_min": 2, "t_mode": 4, "t_max": 7, "iterations": 300_000}}
+SAMPLES = 10
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def run_job(client, body) -> dict:
+    job = client.post("/jobs", json=body).json()
+    while job["status"] in ("queued", "running"):
+        time.sleep(0.005)
+        job = client.get(f"/jobs/{job['id']}").json()
+    return job
+
+
+def report(label, client, small):
+    health = [timed(lambda: client.get("/health")) for _ in range(SAMPLES)]
+    latencies = [timed(lambda: small(client)) for _ in range(SAMPLES)]
+    print(f"{label:<26} | health p50 {np.median(health) * 1000:7.1f}ms | "
+          f"small p50 {np.median(latencies) * 1000:7.1f}ms p95 {np.percentile(latencies, 95) * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+
+    print(f"{os.cpu_count()} cores")
+    with TestClient(app) as client:
+        simulate_small = lambda client: client.post("/simulate", json=SMALL)
+        job_small = lambda client: run_job(client, SMALL)
+        report("idle, /simulate", client, simulate_small)
+        report("idle, /jobs", client, job_small)
+
+        big = [threading.Thread(target=client.post, args=("/simulate",), kwargs={"json": BIG}) for _ in range(2)]
+        for thread in big:
+            thread.start()
+        report("2 big /simulate, /simulate", client, simulate_small)
+        for thread in big:
+            thread.join()
+
+        big = [client.post("/jobs", json=BIG).json()["id"] for _ in range(2)]
+        report("2 big /jobs, /jobs", client, job_small)
+        for job_id in big:
+            client.delete(f"/jobs/{job_id}")
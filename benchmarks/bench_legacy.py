@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'legacySimulator')))
+
+from simulation.throughput_function import simulate_project_delivery
+from simulation.vectorized import simulate_project_delivery_vectorized
+
+"""
+Scalar legacy loop against the vectorized legacy engine, same model and parameters.
+"""
+
+CASES = [
+    ("150 tickets", 150, 10_000),
+    ("2000 tickets", 2000, 2_000),
+]
+
+
+if __name__ == "__main__":
+
+    print(f"{'Case':<13} | {'Runs':>6} | {'Scalar':>8} | {'Vector':>8} | {'Speedup':>8} | P85 s/v")
+    print("-" * 68)
+
+    for name, ticket_goal, runs in CASES:
+        start = time.perf_counter()
+        scalar = [simulate_project_delivery(ticket_goal=ticket_goal) for _ in range(runs)]
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized = simulate_project_delivery_vectorized(runs=runs, ticket_goal=ticket_goal, rng=np.random.default_rng(1))
+        vector_time = time.perf_counter() - start
+
+        print(f"{name:<13} | {runs:>6} | {scalar_time:7.3f}s | {vector_time:7.4f}s | {scalar_time / vector_time:7.0f}x"
+              f" | {np.percentile(scalar, 85):.0f}/{np.percentile(vectorized, 85):.0f}")
@@ -0,0 +1,56 @@
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.simulator import Simulator, PRECISIONS
+from classes.simulation_analyzer import SimulationAnalyzer
+
+"""
+Float64 vs float32 precision policy: simulation time, traced peak memory, size of the
+results, size of the analyzer DataFrame built on them and peak RSS of the whole process.
+Every policy runs in its own subprocess so the RSS of one doesn't hide the other.
+"""
+
+NUM_SIM = 1_000_000
+risks = [Risk("Dependencies", 0.3, 0.7), Risk("Vacations", 0.05, 0.5)]
+
+
+def run_policy(precision):
+    simulator = Simulator(SimulationParameters(300, 3, 5, 9, NUM_SIM), risks, seed=1, precision=precision)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = simulator.run_simulation()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    analyzer = SimulationAnalyzer(results)
+    frame_bytes = analyzer.df.memory_usage(index=False).sum()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 #KB on Linux
+
+    print(f"{precision:<8} | {str(results.dtype):<6} | {elapsed:6.2f}s | {peak / 1024 ** 2:8.1f} | "
+          f"{results.nbytes / 1024 ** 2:8.2f} | {frame_bytes / 1024 ** 2:8.2f} | {rss:7.1f} | "
+          f"{np.percentile(results, 85):5.0f}")
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) > 1:
+        run_policy(sys.argv[1])
+        sys.exit()
+
+    print(f"{NUM_SIM} replicas\n")
+    print(f"{'Policy':<8} | {'Weeks':<6} | {'Time':>7} | {'Peak MB':>8} | {'Res. MB':>8} | "
+          f"{'DF MB':>8} | {'RSS MB':>7} | {'P85':>5}")
+    print("-" * 80)
+    for precision in PRECISIONS:
+        sys.stdout.flush()
+        subprocess.run([sys.executable, __file__, precision], check=True)
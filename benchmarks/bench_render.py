@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from classes.simulation_visualizer import SimulationVisualizer
+from classes.render_pipeline import RenderPipeline
+
+"""
+Wall clock of the image part of a /simulate request: the three plots one after another
+against the warm RenderPipeline, next to the slowest single plot (the target).
+Needs as many free cores as workers to show the overlap.
+"""
+
+PLOTS = {"histogram": {}, "cdf": {}, "convergence": {}}
+REPEATS = 5
+
+
+def best_of(function):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+
+    results = np.random.default_rng(1).binomial(60, 0.5, size=200_000) + 10
+    visualizer = SimulationVisualizer(results)
+    visualizer.plot_cdf() #warm the sequential path too
+
+    print(f"{os.cpu_count()} cores, {results.size} replicas\n")
+    slowest = max(best_of(lambda: visualizer.plot(kind, **options)) for kind, options in PLOTS.items())
+    print(f"{'slowest single plot':<20} | {slowest:6.3f}s")
+    print(f"{'sequential':<20} | {best_of(lambda: [visualizer.plot(k, **o) for k, o in PLOTS.items()]):6.3f}s")
+
+    for executor in ("process", "thread"):
+        with RenderPipeline(workers=len(PLOTS), executor=executor) as pipeline:
+            print(f"{f'pipeline ({executor})':<20} | {best_of(lambda: pipeline.render(visualizer, PLOTS)):6.3f}s")
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+from api.app import app, RESULT_CACHE
+from api.schemas import RunRequest
+from api.service import request_key
+
+"""
+/simulate latency for a new request (miss) and for the same request again (hit), per
+format. "server" is what the handler does on a hit (request key + cache lookup);
+"round trip" adds the in-process test client and the ASGI stack.
+"""
+
+BODY = {
+    "params": {"backlog": 150, "t_min": 3, "t_mode": 5, "t_max": 9, "iterations": 20_000},
+    "risks": [{"name": "Dependencies", "probability": 0.3, "impact": 0.5}],
+    "seed": 1,
+}
+REPEATS = 200
+
+
+def median_ms(function, repeats=REPEATS) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+if __name__ == "__main__":
+
+    with TestClient(app) as client:
+        for image_format in ("png", "svg", "data"):
+            body = {**BODY, "format": image_format}
+            start = time.perf_counter()
+            assert client.post("/simulate", json=body).headers["x-cache"] == "miss"
+            miss = (time.perf_counter() - start) * 1000
+
+            request = RunRequest.model_validate(body)
+            server = median_ms(lambda: RESULT_CACHE.get(request_key(request)))
+            round_trip = median_ms(lambda: client.post("/simulate", json=body))
+            print(f"{image_format:<5} | miss {miss:8.1f}ms | hit server {server:6.3f}ms | hit round trip {round_trip:6.3f}ms")
+
+        print(client.get("/cache").json()["results"])
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.simulator import Simulator, SAMPLINGS
+
+"""
+Replicas needed by every sampling mode to pin down P85 (and the mean) within a tolerance.
+Completion weeks are integers, so the spread of the P85 week itself moves in jumps;
+the benchmark measures instead the standard error of the estimated probability of
+finishing by the exact P85 week (taken from the analytic engine), repeating every
+replica count with different seeds. The baseline is the plain np.random.triangular
+full-matrix path that Simulator used before the sampling modes.
+"""
+
+REPLICAS = [250, 500, 1000, 2000, 4000, 8000, 16000, 32000]
+REPEATS = 30
+P85_TOLERANCE = 0.005 #standard error of P(completion <= exact P85)
+MEAN_TOLERANCE = 0.1 #standard error of the mean completion week
+
+parameters = SimulationParameters(backlog=1000, th_min=3, th_ex=5, th_max=9, num_sim=1000)
+risks = [Risk("Dependencies", 0.3, 0.7), Risk("Vacations", 0.05, 0.5)]
+
+
+def exact_p85():
+    weeks, probabilities = Simulator(parameters, risks).completion_distribution()
+    return weeks[np.searchsorted(np.cumsum(probabilities), 0.85)]
+
+
+def baseline_run(num_sim, seed):
+    rng = np.random.default_rng(seed)
+    th = rng.triangular(parameters.th_min, parameters.th_ex, parameters.th_max, size=(num_sim, 400))
+    for risk in risks:
+        th = np.where(rng.random(th.shape) < risk.probability, th * risk.impact, th)
+    return np.argmax(np.cumsum(th, axis=1) >= parameters.backlog, axis=1) + 1
+
+
+def sampling_run(num_sim, seed, sampling):
+    params = SimulationParameters(parameters.backlog, parameters.th_min, parameters.th_ex, parameters.th_max, num_sim)
+    return Simulator(params, risks, seed=seed, sampling=sampling).run_simulation()
+
+
+def replicas_to_tolerance(run, target):
+    """
+    Smallest replica count reaching each tolerance, as {metric: (replicas, std error)}.
+    """
+    reached = {}
+    for num_sim in REPLICAS:
+        runs = [run(num_sim, seed) for seed in range(REPEATS)]
+        std_errors = {
+            "p85": (np.std([np.mean(r <= target) for r in runs], ddof=1), P85_TOLERANCE),
+            "mean": (np.std([r.mean() for r in runs], ddof=1), MEAN_TOLERANCE),
+        }
+        for metric, (std_err, tolerance) in std_errors.items():
+            if metric not in reached and std_err <= tolerance:
+                reached[metric] = (num_sim, std_err)
+        if len(reached) == len(std_errors):
+            break
+    return reached
+
+
+def label(reached, metric):
+    if metric not in reached:
+        return f"{'>' + str(REPLICAS[-1]):>8} | {'':>7}"
+    replicas, std_err = reached[metric]
+    return f"{replicas:>8} | {std_err:7.4f}"
+
+
+if __name__ == "__main__":
+
+    target = exact_p85()
+    methods = {"baseline": baseline_run}
+    for sampling in SAMPLINGS:
+        methods[sampling] = lambda n, seed, sampling=sampling: sampling_run(n, seed, sampling)
+
+    print(f"Replicas to reach a std error <= {P85_TOLERANCE} on P(week <= P85={target}) "
+          f"and <= {MEAN_TOLERANCE} weeks on the mean ({REPEATS} seeds per point)\n")
+    print(f"{'Method':<12} | {'P85 reps':>8} | {'Std err':>7} | {'Mean reps':>8} | {'Std err':>7} | {'Time':>6}")
+    print("-" * 68)
+
+    for name, run in methods.items():
+        start = time.perf_counter()
+        try:
+            reached = replicas_to_tolerance(run, target)
+        except ImportError as e:
+            print(f"{name:<12} | skipped: {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12} | {label(reached, 'p85')} | {label(reached, 'mean')} | {elapsed:5.1f}s")
@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from classes.simulation_params import SimulationParameters
+from classes.risk_class import Risk
+from classes.simulator import Simulator
+from classes.sensitivity_analyzer import SensitivityAnalyzer
+
+"""
+Time of a few hundred sensitivity sweep points: one Simulator per point (the old way,
+one scenario after another) against the SensitivityAnalyzer batches, serial and parallel.
+"""
+
+params = SimulationParameters(150, 3, 5, 9, 5000)
+risks = [Risk("Dependencies", 0.3, 0.7), Risk("Vacations", 0.05, 0.5), Risk("Rework", 0.1, 0.9)]
+levels = {
+    "th_max": [8, 9, 10, 11],
+    "backlog": [120, 150, 180],
+    "Dependencies.probability": [0.2, 0.3, 0.4],
+    "Rework.impact": [0.8, 0.9],
+    "Vacations.probability": [0.05, 0.1],
+}
+
+
+if __name__ == "__main__":
+
+    analyzer = SensitivityAnalyzer(params, risks, seed=1)
+    points = analyzer.grid(levels)
+    print(f"{len(points)} grid points, {params.num_sim} replicas each")
+
+    start = time.perf_counter()
+    for point in points:
+        Simulator(*analyzer.scenario(point["changes"]), seed=1).run_simulation()
+    print(f"{'one Simulator per point':<26} | {time.perf_counter() - start:6.2f}s")
+
+    for workers in (1, 4):
+        start = time.perf_counter()
+        analyzer.run(points, workers=workers)
+        print(f"{f'analyzer, {workers} workers':<26} | {time.perf_counter() - start:6.2f}s")
+
+    start = time.perf_counter()
+    table = analyzer.tornado(steps=(-0.2, -0.1, 0.1, 0.2), workers=4)
+    print(f"{'tornado (4 steps)':<26} | {time.perf_counter() - start:6.2f}s")
+    for entry in table:
+        print(f"  {entry['factor']:<26} swing P85 {entry['swing']:5.1f}"
+              f" ({entry['low_P85']:+.1f} / {entry['high_P85']:+.1f})")
@@ -12,7 +12,7 @@ This file imports the functions I created and uses them to run and visualize the
 def run_simulation():
 
     #runs Monte Carlo simulation 1000 times
-    simulation = montecarlo_simulation(runs=1000, ticket_goal=150)
+    simulation = montecarlo_simulation(runs=1000, ticket_goal=150, vectorized=True)
 
     # visualize results
     # plot_histogram(simulation)
@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 def plot_convergence_curve(simulation_results):
@@ -7,8 +6,10 @@ def plot_convergence_curve(simulation_results):
     Parameters:
         simulation_results (list): List of simulated delivery durations
     """
+    import matplotlib.pyplot as plt #only when plotting, importing the module stays cheap
 
-    cumulative_means = [np.mean(simulation_results[:i+1]) for i in range(len(simulation_results))]
+    #running mean in one pass: sum of the first i+1 results / (i+1)
+    cumulative_means = np.cumsum(simulation_results) / np.arange(1, len(simulation_results) + 1)
 
     plt.figure(figsize=(10, 5))
     plt.plot(range(1, len(simulation_results) + 1), cumulative_means, label='Cumulative Mean')
@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 def plot_cumulative_distribution (results):
@@ -7,6 +6,7 @@ def plot_cumulative_distribution (results):
     Parameters:
         results (list): List of simulated delivery durations (in weeks)
     """ 
+    import matplotlib.pyplot as plt #only when plotting, importing the module stays cheap
     sorted_data = np.sort (results) #order data from min to max
     cumulative = np.arange (1, len(sorted_data) + 1)/ len(sorted_data) # % acumulated [this is normalizing the date in terms of 0,1]
 
@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 def plot_histogram (results):
@@ -8,6 +7,7 @@ def plot_histogram (results):
     Parameters:
     results (list): List of simulated delivery durations (in weeks)
     """
+    import matplotlib.pyplot as plt #only when plotting, importing the module stays cheap
 
     bins = range(min(results), max(results) + 1)
     plt.figure(figsize=(10, 5))
@@ -43,24 +43,20 @@ sensitivity_configs = [ #Risks scenarios
 ]
 
 
-from simulation.throughput_function import simulate_project_delivery
+from simulation.vectorized import simulate_project_delivery_vectorized
 
 
 def run_simulation_with_params (config, runs=1000):
-    
-    results = []
-
-    for _ in range (runs):
-        result = simulate_project_delivery(
-            ticket_goal=config["ticket_goal"],
-            min_val=config["min_val"],
-            mode=config["mode"],
-            max_val=config["max_val"],
-            risks=config["risks"]
-        )
-        results.append(result)
 
-    return results
+    #all the runs at once, same model as simulate_project_delivery
+    return simulate_project_delivery_vectorized(
+        runs=runs,
+        ticket_goal=config["ticket_goal"],
+        min_val=config["min_val"],
+        mode=config["mode"],
+        max_val=config["max_val"],
+        risks=config["risks"]
+    )
 
 def table_results (name, results):
 
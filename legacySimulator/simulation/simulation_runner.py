@@ -1,6 +1,7 @@
 from simulation.throughput_function import simulate_project_delivery
+from simulation.vectorized import simulate_project_delivery_vectorized
 
-def montecarlo_simulation (runs=1000, ticket_goal=150):
+def montecarlo_simulation (runs=1000, ticket_goal=150, vectorized=False, rng=None):
 
     """
     Runs multiple simulations of project delivery to estimate the
@@ -9,15 +10,20 @@ def montecarlo_simulation (runs=1000, ticket_goal=150):
     Parameters:
         runs (int): Number of simulations to perform
         ticket_goal (int): Total number of tickets to deliver in each run
+        vectorized (bool): Runs all the simulations at once (same model, much faster)
+        rng (Generator): Optional numpy random generator for the vectorized engine
 
     Returns:
         list: A list of weeks required in each simulation
     """
 
+    if vectorized:
+        return simulate_project_delivery_vectorized(runs=runs, ticket_goal=ticket_goal, rng=rng).tolist()
+
     estimated_weeks = []
 
     for k in range(runs):
-        weeks = simulate_project_delivery ()
+        weeks = simulate_project_delivery (ticket_goal=ticket_goal)
         estimated_weeks.append (weeks)
 
     return  estimated_weeks
\ No newline at end of file
@@ -0,0 +1,135 @@
+import numpy as np
+
+"""
+Vectorized version of simulate_project_delivery: same model, all the runs at once.
+Every week of the legacy model delivers an integer number of tickets drawn from the same
+small distribution (rounded triangular throughput, one mutually exclusive risk, rounded
+again, at least 1 ticket). That distribution and the completion week distribution it
+produces are computed exactly, and every run is then one draw from the latter, so the cost
+no longer grows with the weeks of each run.
+"""
+
+
+DEFAULT_RISKS = [                    #values by default, same as simulate_project_delivery
+    {"prob": 0.05, "impact": 0.90},  # team vacation
+    {"prob": 0.10, "impact": 0.80},  # client dependency
+    {"prob": 0.20, "impact": 1.30},  # exceptional performance
+]
+
+
+def triangular_cdf(x, min_value, mode, max_value):
+    """
+    CDF of the triangular distribution evaluated on x (mode can be equal to min or max).
+    """
+    x = np.clip(np.asarray(x, dtype=float), min_value, max_value)
+    width = max_value - min_value
+    rising = (x - min_value) ** 2 / (width * (mode - min_value)) if mode > min_value else np.zeros_like(x)
+    falling = 1 - (max_value - x) ** 2 / (width * (max_value - mode)) if max_value > mode else np.ones_like(x)
+    return np.where(x <= mode, rising, falling)
+
+
+def weekly_throughput_pmf(min_val=3, mode=5, max_val=9, risks=None):
+    """
+    Exact distribution of the tickets delivered in one week by simulate_project_delivery.
+
+    Parameters:
+        min_val (int): Minimum weekly throughput
+        mode (int): Most likely weekly throughput
+        max_val (int): Maximum weekly throughput
+        risks (list): List of risk dicts with 'prob' and 'impact' (DEFAULT_RISKS if None)
+
+    Returns:
+        ndarray: pmf[k] is the probability of delivering k tickets in a week
+    """
+    if not min_val < max_val:
+        raise ValueError("min_val must be lower than max_val")
+    if risks is None:
+        risks = DEFAULT_RISKS
+
+    #round(triangular) = k when the draw falls in [k - 0.5, k + 0.5)
+    base = np.arange(int(np.floor(min_val + 0.5)), int(np.floor(max_val + 0.5)) + 1)
+    base_probs = np.diff(triangular_cdf(np.append(base - 0.5, base[-1] + 0.5), min_val, mode, max_val))
+
+    #risks are mutually exclusive and checked in order, as in get_capacity_multiplier:
+    #risk k takes what its prob leaves below 1 after the previous ones, none the rest
+    impacts = [risk["impact"] for risk in risks] + [1.0]
+    cumulative = np.minimum(np.cumsum([0.0] + [risk["prob"] for risk in risks]), 1.0)
+    probs = np.append(np.diff(cumulative), 1.0 - cumulative[-1])
+
+    pmf = np.zeros(1)
+    for impact, prob in zip(impacts, probs):
+        #same rounding as the scalar version (half to even), th min = 1
+        delivered = np.maximum(1, np.round(base * impact)).astype(np.int64)
+        weights = np.bincount(delivered, weights=base_probs * max(prob, 0.0))
+        pmf = np.pad(pmf, (0, max(0, weights.size - pmf.size)))
+        pmf[:weights.size] += weights
+
+    return pmf / pmf.sum()
+
+
+def completion_weeks_pmf(ticket_goal, weekly_pmf, tolerance=1e-14):
+    """
+    Exact distribution of the number of weeks needed to deliver ticket_goal tickets.
+    Only the probability of the runs that haven't reached the goal is carried from one
+    week to the next (one cell per number of tickets delivered so far); the rest is the
+    probability of finishing that week.
+
+    Returns:
+        ndarray: probabilities[w - 1] is the probability of finishing in week w
+    """
+    goal = int(np.ceil(ticket_goal))
+    if goal < 1:
+        return np.array([1.0]) #the loop always runs at least one week
+
+    unfinished = np.zeros(goal)
+    unfinished[0] = 1.0
+    probabilities = []
+
+    #at least 1 ticket per week, so after goal weeks nothing is left
+    while unfinished.sum() > tolerance and len(probabilities) < goal:
+        carried = np.convolve(unfinished, weekly_pmf)[:goal]
+        probabilities.append(max(unfinished.sum() - carried.sum(), 0.0))
+        unfinished = carried
+
+    probabilities = np.array(probabilities)
+    return probabilities / probabilities.sum()
+
+
+def simulate_project_delivery_vectorized(
+    runs=1000,
+    ticket_goal=150,
+    min_val=3,
+    mode=5,
+    max_val=9,
+    risks=None,
+    rng=None
+):
+    """
+    Simulates runs replicas of simulate_project_delivery at once.
+    Every week: throughput rounded from a triangular draw, one of the mutually exclusive
+    risks chosen by cumulative probability, the adjusted throughput rounded again and
+    never below 1 ticket.
+
+    Parameters:
+        runs (int): Number of simulations to perform
+        ticket_goal (int): Number of tickets to deliver
+        min_val (int): Minimum weekly throughput
+        mode (int): Most likely weekly throughput
+        max_val (int): Maximum weekly throughput
+        risks (list): List of risk dicts with 'prob' and 'impact'
+        rng (Generator): Optional numpy random generator (np.random.default_rng(seed))
+
+    Returns:
+        ndarray: Number of weeks to reach the ticket goal in each simulation
+    """
+
+    if risks is None:
+        risks = DEFAULT_RISKS
+    if rng is None:
+        rng = np.random.default_rng()
+
+    probabilities = completion_weeks_pmf(ticket_goal, weekly_throughput_pmf(min_val, mode, max_val, risks))
+
+    #inverse CDF sampling: one uniform draw per run
+    positions = np.searchsorted(np.cumsum(probabilities), rng.random(runs), side="right")
+    return np.minimum(positions, probabilities.size - 1) + 1
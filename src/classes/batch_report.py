@@ -0,0 +1,179 @@
+import os
+import re
+import time
+from concurrent.futures import as_completed
+import numpy as np
+from .simulation_params import SimulationParameters
+from .risk_class import Risk
+from .simulator import Simulator
+from .simulation_report import SimulationReport
+from .render_pipeline import warm_up
+
+STAGES = ("simulate", "analyze", "render", "pdf")
+
+
+class BatchReportGenerator:
+
+    """
+    Builds the forecast reports of many named scenarios ({name: (parameters, risks)}).
+    Every scenario is simulated, analyzed and rendered in a process pool whose workers
+    are warmed up once (matplotlib, fonts and the template Figure, see RenderPipeline)
+    instead of once per report. Writes one combined PDF, with a comparison page first,
+    or one PDF per scenario (written by the workers themselves).
+
+    Each scenario gets its own seed spawned from seed, by position, so a batch gives
+    the same reports for any number of workers.
+    """
+
+    def __init__(self, scenarios: dict[str, tuple[SimulationParameters, list[Risk]]], seed: int | None = None,
+                 workers: int | None = None, precision: str = "float32", image_format: str = "png"):
+
+        if not scenarios:
+            raise ValueError("scenarios must have at least one scenario")
+        for name, (parameters, risks) in scenarios.items():
+            if not isinstance(parameters, SimulationParameters) or not all(isinstance(risk, Risk) for risk in risks):
+                raise TypeError(f"Scenario {name} must be (SimulationParameters, list of Risk)")
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be a positive integer")
+        if image_format not in ("png", "svg"):
+            raise ValueError("image_format must be 'png' or 'svg'")
+
+        self.scenarios = scenarios
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+        self.workers = workers or os.cpu_count() or 1
+        self.precision = precision
+        self.image_format = image_format
+
+    def generate(self, output: str, combined: bool = True, on_progress=None) -> dict:
+
+        """
+        Writes the reports: output is the PDF path if combined, else the directory that
+        gets one <scenario>.pdf per scenario.
+        on_progress(done, total, name, timings) is called as every scenario finishes.
+        Returns {"paths", "stats": {name: stats}, "timings": {name: {stage: seconds}},
+        "totals": {stage: seconds summed over scenarios}, "wall": seconds}.
+        """
+        start = time.perf_counter()
+        if combined:
+            paths = {name: None for name in self.scenarios}
+        else:
+            os.makedirs(output, exist_ok=True)
+            paths = {name: os.path.join(output, f"{file_name}.pdf") for name, file_name in self._file_names().items()}
+
+        seeds = np.random.SeedSequence(self.seed).spawn(len(self.scenarios))
+        tasks = [(name, parameters, risks, int(seed.generate_state(1, np.uint64)[0]), self.precision,
+                  self.image_format, paths[name])
+                 for (name, (parameters, risks)), seed in zip(self.scenarios.items(), seeds)]
+
+        outcomes = {}
+        if self.workers == 1:
+            warm_up()
+            for task in tasks:
+                outcomes[task[0]] = _build_scenario(*task)
+                self._progress(on_progress, outcomes, task[0])
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), initializer=warm_up) as pool:
+                futures = {pool.submit(_build_scenario, *task): task[0] for task in tasks}
+                for future in as_completed(futures):
+                    outcomes[futures[future]] = future.result()
+                    self._progress(on_progress, outcomes, futures[future])
+
+        outcomes = {name: outcomes[name] for name in self.scenarios} #back in scenario order
+        timings = {name: outcome["timings"] for name, outcome in outcomes.items()}
+        totals = {stage: sum(timing[stage] for timing in timings.values()) for stage in STAGES}
+        if combined:
+            pdf_start = time.perf_counter()
+            self._write_combined(output, outcomes)
+            totals["pdf"] = time.perf_counter() - pdf_start
+
+        return {
+            "paths": [output] if combined else list(paths.values()),
+            "stats": {name: outcome["stats"] for name, outcome in outcomes.items()},
+            "timings": timings,
+            "totals": totals,
+            "wall": time.perf_counter() - start,
+        }
+
+    def _progress(self, on_progress, outcomes: dict, name: str) -> None:
+        if on_progress is not None:
+            on_progress(len(outcomes), len(self.scenarios), name, outcomes[name]["timings"])
+
+    def _file_names(self) -> dict[str, str]:
+
+        """
+        File name of every scenario (unsafe characters replaced), which must be unique.
+        """
+        names = {name: re.sub(r"[^\w.-]+", "_", name).strip("._") or "scenario" for name in self.scenarios}
+        if len(set(names.values())) != len(names):
+            raise ValueError("Scenario names must give unique file names")
+        return names
+
+    def _write_combined(self, output_path: str, outcomes: dict) -> None:
+
+        """
+        One PDF: a comparison table of every scenario, then the pages of each report.
+        """
+        from fpdf import FPDF
+
+        pdf = FPDF()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.add_page()
+
+        pdf.set_font("Arial", "B", 16)
+        pdf.cell(0, 10, "Scenario Comparison", ln=True)
+        pdf.ln(5)
+
+        columns = {"Scenario": 70, "mean": 30, "p50": 30, "p85": 30, "p95": 30}
+        pdf.set_font("Arial", "B", 11)
+        for column, width in columns.items():
+            pdf.cell(width, 8, column, border=1)
+        pdf.ln()
+        pdf.set_font("Arial", size=10)
+        for name, outcome in outcomes.items():
+            pdf.cell(columns["Scenario"], 8, name[:40], border=1)
+            for column in list(columns)[1:]:
+                pdf.cell(columns[column], 8, f"{outcome['stats'][column]:.2f}", border=1)
+            pdf.ln()
+
+        for name, outcome in outcomes.items():
+            SimulationReport.add_pages(pdf, name, outcome["stats"], outcome["images"])
+
+        pdf.output(output_path)
+
+
+def _build_scenario(name: str, parameters: SimulationParameters, risks: list[Risk], seed: int, precision: str,
+                    image_format: str, output_path: str | None) -> dict:
+    """
+    Simulates, analyzes and renders one scenario, timing every stage. Writes its PDF if
+    output_path is given, else returns the images for the combined PDF.
+    """
+    timings = dict.fromkeys(STAGES, 0.0)
+
+    start = time.perf_counter()
+    results = Simulator(parameters, risks, precision=precision, seed=seed).run_simulation()
+    timings["simulate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = SimulationReport(results)
+    stats = report.summary_stats()
+    stats.update(report.analyzer.percentiles(percentiles=(0.5, 0.85, 0.95)))
+    timings["analyze"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    images = report.render_images(image_format)
+    timings["render"] = time.perf_counter() - start
+
+    outcome = {"stats": stats, "timings": timings, "images": images if output_path is None else None}
+    if output_path is not None:
+        from fpdf import FPDF
+
+        start = time.perf_counter()
+        pdf = FPDF()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        SimulationReport.add_pages(pdf, name, stats, images)
+        pdf.output(output_path)
+        timings["pdf"] = time.perf_counter() - start
+
+    return outcome
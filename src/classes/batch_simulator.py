@@ -0,0 +1,206 @@
+import math
+import numpy as np
+from .simulation_params import SimulationParameters
+from .risk_class import Risk
+
+
+class BatchSimulator:
+
+    """
+    Runs many scenarios (SimulationParameters + risks) in one vectorized pass over a
+    shared set of uniform draws (common random numbers).
+    Replica i of every scenario uses the same throughput uniforms, and the k-th risk of
+    every scenario uses the same risk uniforms, so the difference between two scenarios
+    comes from their inputs and not from sampling noise. The sampling cost is paid once
+    for the whole batch.
+
+    Each scenario uses the first num_sim replicas of the shared pool. With the same seed,
+    pool size and an explicit block_weeks, a scenario gets the same results no matter
+    which other scenarios are in the batch (by default block_weeks is sized from the
+    scenarios themselves).
+    """
+
+    CHUNK_SIZE = 4096 #most replicas per chunk
+    STREAM_ROWS = 256 #replicas per set of streams, fixed so results don't depend on the memory budget
+
+    def __init__(self, scenarios: dict[str, tuple[SimulationParameters, list[Risk]]], seed: int | None = None,
+                 memory_budget_mb: float = 256, block_weeks: int | None = None):
+
+        if not isinstance(scenarios, dict) or not scenarios:
+            raise ValueError("scenarios must be a non empty dict of name -> (parameters, risks)")
+        for name, scenario in scenarios.items():
+            if not (isinstance(scenario, tuple) and len(scenario) == 2
+                    and isinstance(scenario[0], SimulationParameters)
+                    and all(isinstance(risk, Risk) for risk in scenario[1])):
+                raise TypeError(f"Scenario {name} must be a (SimulationParameters, list[Risk]) tuple")
+        if memory_budget_mb is None or not memory_budget_mb > 0:
+            raise ValueError("memory_budget_mb must be a positive number")
+        if block_weeks is not None and block_weeks < 1:
+            raise ValueError("block_weeks must be a positive integer")
+
+        self.scenarios = scenarios
+        self.memory_budget_mb = memory_budget_mb
+        self.block_weeks = block_weeks or self._initial_horizon()
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.results = None
+
+    def run(self, num_sim: int | None = None, max_weeks: int | None = None) -> dict[str, np.ndarray]:
+
+        """
+        Simulates every scenario and returns {name: completion weeks}.
+        num_sim sets the size of the shared replica pool (by default the largest num_sim
+        of the scenarios); each scenario uses min(its num_sim, pool) replicas.
+        max_weeks is an optional safety cap, as in Simulator.run_simulation.
+        """
+        names = list(self.scenarios)
+        params = [self.scenarios[name][0] for name in names]
+        risks = [self.scenarios[name][1] for name in names]
+
+        pool = num_sim if num_sim is not None else max(p.num_sim for p in params)
+        if pool < 1:
+            raise ValueError("num_sim must be a positive integer")
+        sizes = np.array([min(p.num_sim, pool) for p in params])
+
+        #per scenario inputs, risks padded with probability 0 so every scenario has the same slots
+        slots = max(len(r) for r in risks)
+        left = np.array([p.th_min for p in params], dtype=np.float64)
+        mode = np.array([p.th_ex for p in params], dtype=np.float64)
+        right = np.array([p.th_max for p in params], dtype=np.float64)
+        backlog = np.array([p.backlog for p in params], dtype=np.float64)
+        probability = np.zeros((len(names), slots))
+        impact = np.ones((len(names), slots))
+        for s, scenario_risks in enumerate(risks):
+            for k, risk in enumerate(scenario_risks):
+                probability[s, k] = risk.probability
+                impact[s, k] = risk.impact
+
+        inputs = (left, mode, right, backlog, probability, impact)
+        run_seed = self.seed_sequence.spawn(1)[0]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]) #every scenario is a slice of one flat array
+        weeks = np.zeros(sizes.sum(), dtype=np.int64)
+
+        chunk_size = self._chunk_rows(slots, len(names))
+        for start in range(0, pool, chunk_size):
+            chunk = min(chunk_size, pool - start)
+            #streams[i][k]: replicas [start + i * STREAM_ROWS, ...) of stream k
+            streams = [
+                [np.random.default_rng(np.random.SeedSequence(run_seed.entropy, spawn_key=run_seed.spawn_key + (first, slot)))
+                 for slot in range(slots + 1)]
+                for first in range(start, start + chunk, self.STREAM_ROWS)
+            ]
+            self._simulate_chunk(streams, start, chunk, sizes, inputs, weeks, offsets, max_weeks)
+
+        self.results = dict(zip(names, np.split(weeks, offsets[1:])))
+        return self.results
+
+    def _simulate_chunk(self, streams: list[list[np.random.Generator]], start: int, chunk: int, sizes: np.ndarray,
+                        inputs: tuple, weeks: np.ndarray, offsets: np.ndarray, max_weeks: int | None) -> None:
+
+        """
+        Runs replicas [start, start + chunk) of every scenario, block of weeks by block of
+        weeks, retiring each (scenario, replica) pair when it reaches its backlog.
+        Stream 0 draws the throughput uniforms and stream k + 1 the uniforms of risk slot k,
+        every STREAM_ROWS replicas from their own set of streams.
+        Completion weeks are written in the flat weeks array (scenario s starts at offsets[s]).
+        """
+        left, mode, right, backlog, probability, impact = inputs
+
+        #active (scenario, replica) pairs: scenario s uses replicas below sizes[s]
+        counts = np.clip(sizes - start, 0, chunk)
+        scenario = np.repeat(np.arange(sizes.size), counts)
+        replica = np.concatenate([np.arange(count) for count in counts])
+        carried = np.zeros(scenario.size)
+        weeks_done = 0
+
+        while scenario.size:
+            block_weeks = self.block_weeks
+            if max_weeks is not None:
+                if weeks_done >= max_weeks:
+                    raise RuntimeError(
+                        f"{scenario.size} replicas did not reach the backlog within {max_weeks} weeks"
+                    )
+                block_weeks = min(block_weeks, max_weeks - weeks_done)
+
+            #the shared draws of this block, for every replica of the chunk
+            draws = np.empty((len(streams[0]), chunk, block_weeks))
+            for i, piece in enumerate(streams):
+                for slot, stream in enumerate(piece):
+                    stream.random(out=draws[slot, i * self.STREAM_ROWS:(i + 1) * self.STREAM_ROWS])
+            th_uniforms, risk_uniforms = draws[0], draws[1:]
+
+            finished = np.zeros(scenario.size, dtype=bool)
+            group = self._group_rows(block_weeks)
+            for first in range(0, scenario.size, group):
+                rows = slice(first, first + group)
+                s, r = scenario[rows], replica[rows]
+
+                th = _triangular_ppf(th_uniforms[r], left[s, None], mode[s, None], right[s, None])
+                for slot, uniforms in enumerate(risk_uniforms):
+                    hit = uniforms[r] < probability[s, slot, None]
+                    np.multiply(th, impact[s, slot, None], out=th, where=hit)
+
+                reached = np.cumsum(th, axis=1) >= (backlog[s] - carried[rows])[:, None]
+                done = reached[:, -1]
+                weeks[offsets[s[done]] + start + r[done]] = weeks_done + np.argmax(reached[done], axis=1) + 1
+
+                carried[rows] += th.sum(axis=1)
+                finished[rows] = done
+
+            scenario, replica, carried = scenario[~finished], replica[~finished], carried[~finished]
+            weeks_done += block_weeks
+
+    def _initial_horizon(self) -> int:
+
+        """
+        First block size: the median expected completion time of the scenarios with some
+        margin, so most pairs finish in one block (see Simulator._initial_horizon).
+        """
+        expected_weeks = []
+        for params, risks in self.scenarios.values():
+            expected_th = (params.th_min + params.th_ex + params.th_max) / 3
+            for risk in risks:
+                expected_th *= 1 - risk.probability * (1 - risk.impact)
+            expected_weeks.append(params.backlog / expected_th)
+
+        return math.ceil(1.25 * float(np.median(expected_weeks))) + 1
+
+    def _chunk_rows(self, slots: int, num_scenarios: int) -> int:
+
+        """
+        Replicas per chunk so the uniforms of a block and the bookkeeping of the active
+        pairs fit half the memory budget (the row groups get the other half). A multiple
+        of STREAM_ROWS, at least one set of streams.
+        """
+        bytes_per_replica = 8 * (slots + 1) * self.block_weeks + 4 * 8 * num_scenarios
+        rows = int(self.memory_budget_mb * 1024 ** 2 / 2 // bytes_per_replica)
+        return min(self.CHUNK_SIZE, max(1, rows // self.STREAM_ROWS) * self.STREAM_ROWS)
+
+    def _group_rows(self, block_weeks: int) -> int:
+
+        """
+        Number of (scenario, replica) rows processed together so the gathered uniforms,
+        the throughput and the temporaries of its inverse CDF fit half the memory budget.
+        """
+        bytes_per_cell = 8 * 8 + 2
+        budget = self.memory_budget_mb * 1024 ** 2 / 2
+        return max(1, int(budget // (bytes_per_cell * block_weeks)))
+
+    def get_results(self) -> dict[str, np.ndarray]:
+        """
+        This is to make sure the batch is run before trying to pull the results.
+        """
+        if self.results is None:
+            raise RuntimeError("The simulation has not been run yet")
+        return self.results
+
+
+def _triangular_ppf(u: np.ndarray, left, mode, right) -> np.ndarray:
+    """
+    Inverse CDF of the triangular distribution. left, mode and right are numbers or
+    arrays broadcast against u (one triangle per row).
+    """
+    width = right - left
+    left_share = (mode - left) / width
+    rising = left + np.sqrt(u * width * (mode - left))
+    falling = right - np.sqrt((1 - u) * width * (right - mode))
+    return np.where(u < left_share, rising, falling)
@@ -0,0 +1,162 @@
+"""
+Content-addressed cache of byte payloads (rendered images, serialized results...).
+Keys are hashes of everything the payload depends on (see content_key), so equal
+inputs hit the same entry no matter who computed them.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+def content_key(*parts) -> str:
+    """
+    SHA-256 hex digest of the parts. Arrays are hashed by dtype, shape and raw bytes;
+    dicts, lists and scalars by their canonical JSON (sorted keys).
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(f"ndarray:{part.dtype.str}:{part.shape}:".encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, bytes):
+            digest.update(b"bytes:" + part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+class ByteCache:
+    """
+    Bounded in-memory LRU of bytes values with an optional on-disk tier.
+    The memory tier evicts the least recently used entries once the stored bytes go over
+    max_bytes. With disk_dir, every value is also written there (one file per key) and a
+    memory miss is looked up on disk before counting as a miss; the disk tier is not
+    bounded. With ttl (seconds), entries older than ttl are misses in both tiers (on disk
+    the age is the file's modification time). Safe to share between threads.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 ** 2, disk_dir: str | None = None, ttl: float | None = None):
+        if max_bytes is None or max_bytes < 0:
+            raise ValueError("max_bytes must be a non negative integer")
+        if ttl is not None and not ttl > 0:
+            raise ValueError("ttl must be a positive number of seconds")
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries = OrderedDict() #key -> (value, time stored)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            if key in self._entries:
+                value, stored = self._entries[key]
+                if not self._expired(stored):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.bytes -= len(value)
+                self.expirations += 1
+
+        value, stored = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value, stored)
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        if not isinstance(value, bytes):
+            raise TypeError("ByteCache only stores bytes")
+        with self._lock:
+            self._store(key, value, time.time())
+        self._write_disk(key, value)
+
+    def get_or_compute(self, key: str, compute) -> bytes:
+        """
+        Cached value of key, or compute() stored under key on a miss.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Empties the memory tier (the disk tier and the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _expired(self, stored: float) -> bool:
+        return self.ttl is not None and time.time() - stored > self.ttl
+
+    def _store(self, key: str, value: bytes, stored: float) -> None:
+        if key in self._entries:
+            self.bytes -= len(self._entries.pop(key)[0])
+        if len(value) > self.max_bytes:
+            return #would evict everything else and still not fit
+        self._entries[key] = (value, stored)
+        self.bytes += len(value)
+        while self.bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key)
+
+    def _read_disk(self, key: str) -> tuple[bytes | None, float | None]:
+        """(value, time stored) of key on disk, (None, None) if missing or expired."""
+        if self.disk_dir is None:
+            return None, None
+        try:
+            with open(self._path(key), "rb") as f:
+                stored = os.fstat(f.fileno()).st_mtime
+                if self._expired(stored):
+                    with self._lock:
+                        self.expirations += 1
+                    return None, None
+                return f.read(), stored
+        except FileNotFoundError:
+            return None, None
+
+    def _write_disk(self, key: str, value: bytes) -> None:
+        if self.disk_dir is None:
+            return
+        temporary = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(value)
+        os.replace(temporary, self._path(key)) #atomic, readers never see half a file
@@ -0,0 +1,194 @@
+import numpy as np
+
+
+class CompletionHistogram:
+
+    """
+    Completion weeks stored as counts per week (np.bincount) instead of one value per replica.
+    Weeks are small integers, so the size depends on the spread of the weeks and not on
+    num_sim: 10M replicas that finish between weeks 20 and 80 fit in 61 counts.
+    Every statistic is computed from the counts in O(number of weeks), and two histograms
+    of the same model (e.g. two shards) merge exactly by adding their counts.
+    Replica order is not kept, so it can't be used for convergence plots.
+    """
+
+    def __init__(self, counts: np.ndarray, first_week: int = 0):
+
+        counts = np.asarray(counts)
+        if counts.ndim != 1 or counts.dtype.kind not in "iu":
+            raise TypeError("counts must be a 1-dimensional integer array")
+        if counts.size and counts.min() < 0:
+            raise ValueError("counts can't be negative")
+
+        #trims the empty weeks at both ends, so equal histograms have equal counts
+        filled = np.flatnonzero(counts)
+        if filled.size:
+            first_week += int(filled[0])
+            counts = counts[filled[0]:filled[-1] + 1]
+        else:
+            first_week, counts = 0, counts[:0]
+
+        self.first_week = first_week
+        self.counts = counts.astype(np.int64)
+
+    @classmethod
+    def from_results(cls, results: np.ndarray) -> "CompletionHistogram":
+
+        """
+        Builds the histogram of an array of completion weeks.
+        """
+        results = np.asarray(results)
+        if results.ndim != 1 or results.dtype.kind not in "iu":
+            raise TypeError("results must be a 1-dimensional array of integer weeks")
+        if not results.size:
+            return cls(np.zeros(0, dtype=np.int64))
+
+        first_week = int(results.min())
+        return cls(np.bincount(results - results.dtype.type(first_week)), first_week)
+
+    @property
+    def weeks(self) -> np.ndarray:
+        return np.arange(self.first_week, self.first_week + self.counts.size)
+
+    @property
+    def num_sim(self) -> int:
+        return int(self.counts.sum())
+
+    def merge(self, other: "CompletionHistogram") -> "CompletionHistogram":
+
+        """
+        Exact union of two histograms (the counts of every week are added).
+        """
+        if not isinstance(other, CompletionHistogram):
+            raise TypeError("Only a CompletionHistogram can be merged")
+        if not self.counts.size or not other.counts.size:
+            return CompletionHistogram(self.counts if self.counts.size else other.counts,
+                                       self.first_week if self.counts.size else other.first_week)
+
+        first_week = min(self.first_week, other.first_week)
+        last_week = max(self.first_week + self.counts.size, other.first_week + other.counts.size)
+        counts = np.zeros(last_week - first_week, dtype=np.int64)
+        for histogram in (self, other):
+            start = histogram.first_week - first_week
+            counts[start:start + histogram.counts.size] += histogram.counts
+        return CompletionHistogram(counts, first_week)
+
+    __add__ = merge
+
+    def percentile(self, q):
+
+        """
+        Percentile(s) q (0-100) with the same linear interpolation as np.percentile on
+        the raw results: the order statistics are read from the cumulative counts.
+        """
+        n = self.num_sim
+        if not n:
+            raise ValueError("The histogram is empty")
+
+        positions = np.asarray(q, dtype=np.float64) / 100 * (n - 1)
+        low = np.floor(positions)
+        high = np.minimum(low + 1, n - 1)
+        cumulative = np.cumsum(self.counts)
+        low_weeks = self.first_week + np.searchsorted(cumulative, low, side="right")
+        high_weeks = self.first_week + np.searchsorted(cumulative, high, side="right")
+        values = low_weeks + (high_weeks - low_weeks) * (positions - low)
+        return float(values) if np.ndim(values) == 0 else values
+
+    def bootstrap_intervals(self, percentiles=(50, 85, 95), confidence: float = 0.95, num_resamples: int = 1000,
+                            seed: int | None = None) -> dict:
+
+        """
+        Bootstrap confidence interval of every percentile (0-100): {percentile: (low, high)}.
+        Resampling num_sim replicas with replacement only changes how many replicas land
+        on each week, so every resample is one multinomial draw of the counts. The cost is
+        O(num_resamples x weeks) instead of O(num_resamples x num_sim).
+        """
+        n = self.num_sim
+        if not n:
+            raise ValueError("The histogram is empty")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        if num_resamples is None or num_resamples < 2:
+            raise ValueError("num_resamples must be an integer >= 2")
+
+        rng = np.random.default_rng(seed)
+        cumulative = np.cumsum(rng.multinomial(n, self.counts / n, size=num_resamples), axis=1)
+
+        intervals = {}
+        for percentile in percentiles:
+            position = percentile / 100 * (n - 1)
+            low, high = np.floor(position), min(np.floor(position) + 1, n - 1)
+            #order statistic of rank r: first week whose cumulative count exceeds r
+            low_weeks = (cumulative <= low).sum(axis=1)
+            high_weeks = (cumulative <= high).sum(axis=1)
+            estimates = self.first_week + low_weeks + (high_weeks - low_weeks) * (position - low)
+            bounds = np.quantile(estimates, [(1 - confidence) / 2, (1 + confidence) / 2])
+            intervals[percentile] = (float(bounds[0]), float(bounds[1]))
+
+        return intervals
+
+    def mean(self) -> float:
+        if not self.num_sim:
+            raise ValueError("The histogram is empty")
+        return float(np.dot(self.weeks, self.counts) / self.num_sim)
+
+    def std(self, ddof: int = 0) -> float:
+        n = self.num_sim
+        if n <= ddof:
+            raise ValueError("Not enough replicas for this ddof")
+        deviations = self.weeks - self.mean()
+        return float(np.sqrt(np.dot(deviations ** 2, self.counts) / (n - ddof)))
+
+    def cdf(self) -> tuple[np.ndarray, np.ndarray]:
+
+        """
+        (weeks, probability of finishing by each week).
+        """
+        return self.weeks, np.cumsum(self.counts) / self.num_sim
+
+    def plot_data(self) -> tuple[np.ndarray, np.ndarray]:
+
+        """
+        (weeks, counts) ready for a bar plot (one bar per week).
+        """
+        return self.weeks, self.counts
+
+    def filter_outliers(self, z_thresh: float = 3.0) -> "CompletionHistogram":
+
+        """
+        Histogram without the weeks further than z_thresh standard deviations from the
+        mean (same rule as SimulationAnalyzer.filter_outliers).
+        """
+        mean, std = self.mean(), self.std()
+        kept = np.abs((self.weeks - mean) / std) <= z_thresh
+        return CompletionHistogram(np.where(kept, self.counts, 0), self.first_week)
+
+    def to_results(self) -> np.ndarray:
+
+        """
+        Expands the histogram back into one (sorted) completion week per replica.
+        """
+        return np.repeat(self.weeks, self.counts)
+
+    def to_dict(self) -> dict:
+
+        """
+        Serializable form, e.g. to cache or send it as JSON.
+        """
+        return {"first_week": self.first_week, "counts": self.counts.tolist()}
+
+    @staticmethod
+    def from_dict(data: dict) -> "CompletionHistogram":
+        for key in ("first_week", "counts"):
+            if key not in data:
+                raise ValueError(f"Field {key} is missing")
+        return CompletionHistogram(np.asarray(data["counts"], dtype=np.int64), int(data["first_week"]))
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, CompletionHistogram) and self.first_week == other.first_week
+                and np.array_equal(self.counts, other.counts))
+
+    __hash__ = None #compared by value but counts is a mutable array, so not hashable on purpose
+
+    def __repr__(self):
+        return f"CompletionHistogram(first_week={self.first_week}, weeks={self.counts.size}, num_sim={self.num_sim})"
@@ -0,0 +1,113 @@
+"""
+Convergence series of a simulation: how the mean and a percentile estimate evolve as
+replicas are added, at every replica, in O(n log distinct) time and O(n) memory.
+The running mean comes from cumulative sums. The running percentile comes from order
+statistics of every prefix, answered together by a wavelet matrix over the value codes:
+one vectorized pass per bit of the code, each narrowing every query to the half of the
+values that holds its answer, instead of one sort per prefix.
+
+Why not a running histogram of the weeks: reading a percentile of every prefix from
+running counts costs one O(n) pass per distinct week (5s for 200k replicas over 3000
+weeks), and float results have no small set of weeks at all. Updating the histogram
+replica by replica is a Python loop, too slow at 1M replicas. The wavelet matrix is the
+same running counts, kept per bit of the week code instead of per week, so the cost
+grows with log(distinct) and every step stays vectorized.
+
+The percentile band is the order statistic band at ranks n*p -/+ z*sqrt(n*p*(1-p)),
+the limit of the percentile bootstrap: resampling every prefix would not be linear.
+"""
+
+from statistics import NormalDist
+import numpy as np
+
+QUERY_CHUNK = 1 << 16 #order statistic queries answered together
+
+
+def convergence_series(results: np.ndarray, percentile: float = 85, confidence: float = 0.95,
+                       step: int = 1) -> dict:
+    """
+    Returns the running estimates after n = step, 2*step, ... replicas (every replica by
+    default) as a dict of arrays:
+      n, mean, mean_low, mean_high: running mean and its normal confidence band
+      percentile, low, high: running percentile (linear interpolation, as np.percentile)
+        and its distribution free band, the order statistics at ranks
+        n*p -/+ z*sqrt(n*p*(1-p)) (the limit of the percentile bootstrap, without resampling)
+    """
+    results = np.asarray(results)
+    if results.ndim != 1 or results.size < 1:
+        raise ValueError("Results must be a non empty 1-dimensional array.")
+    if step < 1:
+        raise ValueError("Step must be a positive integer.")
+    if not 0 <= percentile <= 100:
+        raise ValueError("percentile must be between 0 and 100")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+
+    n = np.arange(step, results.size + 1, step)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    data = results.astype(np.float64, copy=False)
+    mean = np.cumsum(data)[n - 1] / n
+    squares = np.cumsum(data ** 2)[n - 1] / n
+    std_error = np.sqrt(np.maximum(squares - mean ** 2, 0) / n) #population variance, fine at these n
+
+    p = percentile / 100
+    position = p * (n - 1)
+    low_rank = np.floor(position).astype(np.int64)
+    high_rank = np.minimum(low_rank + 1, n - 1)
+    spread = z * np.sqrt(n * p * (1 - p))
+    band_low = np.clip(np.floor(n * p - spread), 0, n - 1).astype(np.int64)
+    band_high = np.clip(np.ceil(n * p + spread), 0, n - 1).astype(np.int64)
+
+    low_value, high_value, lower, upper = running_order_statistics(results, n, [low_rank, high_rank, band_low, band_high])
+
+    return {
+        "n": n,
+        "mean": mean,
+        "mean_low": mean - z * std_error,
+        "mean_high": mean + z * std_error,
+        "percentile": low_value + (high_value - low_value) * (position - low_rank),
+        "low": lower,
+        "high": upper,
+    }
+
+
+def running_order_statistics(results: np.ndarray, n: np.ndarray, ranks: list[np.ndarray]) -> list[np.ndarray]:
+    """
+    For every prefix length n[i], the value of rank ranks[j][i] (0-based) among the first
+    n[i] results, for every j.
+    The wavelet matrix stably splits the codes level by level, from the highest bit, by
+    that bit (zeros first) and keeps the running count of zeros of every level. A query
+    keeps the range [low, high) of its prefix in the current order and the rank it looks
+    for: if the rank is below the zeros of its range the answer has a 0 at that bit and
+    the query follows its zeros, otherwise a 1 and it follows its ones, skipping the
+    zeros from its rank. Queries are answered in chunks so their temporaries stay small.
+    """
+    values, codes = np.unique(results, return_inverse=True)
+    codes = codes.ravel()
+    index = np.int32 if codes.size < 2 ** 31 else np.int64
+
+    levels = [] #(level, zeros among the first i codes of that level)
+    for level in reversed(range(max(1, (values.size - 1).bit_length()))):
+        is_zero = (codes >> level) & 1 == 0
+        levels.append((level, np.concatenate([[0], np.cumsum(is_zero, dtype=index)])))
+        codes = np.concatenate([codes[is_zero], codes[~is_zero]])
+    del codes
+
+    answers = []
+    for rank_j in ranks:
+        answer = np.zeros(n.size, dtype=np.intp)
+        for first in range(0, n.size, QUERY_CHUNK):
+            queries = slice(first, first + QUERY_CHUNK)
+            rank = rank_j[queries].astype(index)
+            high = n[queries].astype(index)
+            low = np.zeros_like(high)
+            for level, zeros_before in levels:
+                zeros_low, zeros_high = zeros_before[low], zeros_before[high]
+                one = rank >= zeros_high - zeros_low
+                rank = np.where(one, rank - (zeros_high - zeros_low), rank)
+                low = np.where(one, zeros_before[-1] + low - zeros_low, zeros_low)
+                high = np.where(one, zeros_before[-1] + high - zeros_high, zeros_high)
+                answer[queries] |= one.astype(np.intp) << level
+        answers.append(values[answer].astype(np.float64))
+    return answers
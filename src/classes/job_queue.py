@@ -0,0 +1,260 @@
+"""
+Background jobs with priorities, for work too long to run inside a request.
+A queue accepts a module-level function and its arguments, returns a Job right away and
+runs it later on a bounded pool of workers, highest priority first. JobQueue is the
+interface; LocalJobQueue keeps everything in this process (heap + process pool). Other
+backends (e.g. a shared broker) can be added to QUEUES and picked by name.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from .worker_pool import start_pool
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class Job:
+    """
+    One submitted call and its state. result is what the function returned and error
+    the message of what it raised.
+    """
+
+    def __init__(self, function, args: tuple, priority: str):
+        self.id = uuid.uuid4().hex
+        self.function = function
+        self.args = args
+        self.priority = priority
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue(ABC):
+    """
+    Interface of a job queue backend.
+    """
+    name = None
+
+    def start(self) -> "JobQueue":
+        return self
+
+    def shutdown(self) -> None:
+        pass
+
+    @abstractmethod
+    def submit(self, function, *args, priority: str = "normal") -> Job:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Job | None:
+        ...
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> Job | None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class LocalJobQueue(JobQueue):
+    """
+    In-process backend: queued jobs wait in a priority heap (FIFO within a priority) and
+    at most `workers` run at a time in a process pool, so CPU-bound jobs never hold the
+    GIL of the API process. The last worker is kept for "high" jobs (when workers > 1),
+    so a small high priority job starts right away even while big ones fill the pool.
+
+    A queued job is cancelled before it starts. A running one can't be interrupted
+    (process pools can't kill a task): it is marked cancelled and its result dropped.
+    At most max_queued jobs wait and max_finished finished jobs are remembered (oldest
+    forgotten first). Safe to use from several threads.
+    """
+    name = "local"
+
+    def __init__(self, workers: int | None = None, max_queued: int = 1000, max_finished: int = 1000,
+                 executor: str = "process", initializer=None):
+
+        if executor not in ("process", "thread"):
+            raise ValueError("executor must be 'process' or 'thread'")
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be a positive integer")
+        if max_queued < 1 or max_finished < 1:
+            raise ValueError("max_queued and max_finished must be positive integers")
+
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.executor = executor
+        self.initializer = initializer
+
+        self._pool = None
+        self._lock = threading.RLock() #done callbacks may run in the thread that holds it
+        self._jobs = {}
+        self._heap = []
+        self._order = itertools.count()
+        self._running = {}
+        self._abandoned = set() #futures of cancelled jobs still busy in a worker
+        self._finished = deque()
+
+    def start(self) -> "LocalJobQueue":
+        """
+        Starts the worker pool and runs the initializer of every worker now, not on the
+        first jobs (idempotent).
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = start_pool(self.executor, self.workers, initializer=self.initializer)
+        return self
+
+    def shutdown(self) -> None:
+        """Cancels the queued jobs and waits for the running ones."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            while self._heap:
+                _, _, job_id = heapq.heappop(self._heap)
+                self._finish(self._jobs[job_id], "cancelled")
+        if pool is not None:
+            pool.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def submit(self, function, *args, priority: str = "normal") -> Job:
+        """
+        Queues function(*args) and returns its Job. function must be picklable (module
+        level) for the process pool. Raises RuntimeError if the queue is full.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {list(PRIORITIES)}")
+        self.start()
+
+        job = Job(function, args, priority)
+        with self._lock:
+            if len(self._heap) >= self.max_queued:
+                raise RuntimeError(f"The job queue is full ({self.max_queued} jobs waiting)")
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (PRIORITIES[priority], next(self._order), job.id))
+            self._dispatch()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """
+        Cancels a queued or running job and returns it (None if unknown). Finished jobs
+        are returned unchanged.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            if job.status == "queued":
+                self._heap = [entry for entry in self._heap if entry[2] != job_id]
+                heapq.heapify(self._heap)
+            else:
+                future = self._running.pop(job_id)
+                if not future.cancel():
+                    self._abandoned.add(future) #keeps its worker busy until it ends, result dropped
+            self._finish(job, "cancelled")
+            self._dispatch()
+            return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": len(self._heap),
+                "running": len(self._running),
+                "finished": len(self._finished),
+            }
+
+    def _dispatch(self) -> None:
+        """
+        Starts queued jobs while there are free workers. Called with the lock held.
+        """
+        while self._heap and self._pool is not None:
+            free = self.workers - len(self._running) - len(self._abandoned)
+            priority = self._heap[0][0]
+            if free <= 0 or (free == 1 and self.workers > 1 and priority != PRIORITIES["high"]):
+                return #the last free worker waits for a high priority job
+            _, _, job_id = heapq.heappop(self._heap)
+            job = self._jobs[job_id]
+            job.status, job.started_at = "running", time.time()
+            try:
+                future = self._pool.submit(job.function, *job.args)
+            except Exception as error: #e.g. BrokenProcessPool after a worker died
+                job.error = f"{type(error).__name__}: {error}"
+                self._finish(job, "failed")
+                continue
+            self._running[job_id] = future
+            future.add_done_callback(lambda future, job=job: self._complete(job, future))
+
+    def _complete(self, job: Job, future) -> None:
+        with self._lock:
+            if self._running.get(job.id) is not future:
+                if future in self._abandoned: #cancelled while running, its worker is free now
+                    self._abandoned.discard(future)
+                    self._dispatch()
+                return
+            del self._running[job.id]
+            error = future.exception()
+            if error is None:
+                job.result = future.result()
+                self._finish(job, "done")
+            else:
+                job.error = f"{type(error).__name__}: {error}"
+                self._finish(job, "failed")
+            self._dispatch()
+
+    def _finish(self, job: Job, status: str) -> None:
+        """Marks job finished and forgets the oldest finished jobs. Called with the lock held."""
+        job.status, job.finished_at = status, time.time()
+        job.function = job.args = None
+        self._finished.append(job.id)
+        while len(self._finished) > self.max_finished:
+            self._jobs.pop(self._finished.popleft(), None)
+
+
+QUEUES = {
+    LocalJobQueue.name: LocalJobQueue,
+}
+
+
+def create_queue(name: str = "local", **options) -> JobQueue:
+    """
+    Job queue backend registered under name, built with options.
+    """
+    if name not in QUEUES:
+        raise ValueError(f"Unknown job queue {name}, must be one of {list(QUEUES)}")
+    return QUEUES[name](**options)
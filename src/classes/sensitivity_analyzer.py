@@ -0,0 +1,203 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .simulation_params import SimulationParameters
+from .risk_class import Risk
+from .batch_simulator import BatchSimulator
+
+
+PARAMETER_FACTORS = ("th_min", "th_ex", "th_max", "backlog")
+
+class SensitivityAnalyzer:
+
+    """
+    Measures how the completion percentiles move when the inputs move.
+    Factors are the throughput and backlog parameters plus the probability and impact of
+    every risk, named "<risk_name>.probability" and "<risk_name>.impact".
+
+    Every sweep point is a scenario of a BatchSimulator run with the same seed, pool size
+    and block_weeks, so all points share their random numbers (common random numbers):
+    a delta against the base comes from the changed input and not from sampling noise.
+    Points are split across a process pool; since a scenario's results don't depend on
+    the rest of its batch, the table is the same for any number of workers.
+    """
+
+    def __init__(self, parameters: SimulationParameters, risks: list[Risk], seed: int | None = None,
+                 num_sim: int | None = None, memory_budget_mb: float = 256):
+
+        if not isinstance(parameters, SimulationParameters) or not all(isinstance(risk, Risk) for risk in risks):
+            raise TypeError("parameters must be SimulationParameters and risks a list of Risk")
+        names = [risk.risk_name for risk in risks]
+        if len(set(names)) != len(names):
+            raise ValueError("Risk names must be unique to be used as factors")
+
+        self.parameters = parameters
+        self.risks = risks
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy #every batch needs the same seed
+        self.num_sim = num_sim or parameters.num_sim
+        self.memory_budget_mb = memory_budget_mb
+        #fixed from the base scenario, so every batch blocks its weeks the same way
+        self.block_weeks = BatchSimulator({"base": (parameters, risks)}).block_weeks
+
+    def factors(self) -> list[str]:
+
+        """
+        Names of every factor that can be swept.
+        """
+        risk_factors = [f"{risk.risk_name}.{field}" for risk in self.risks for field in ("probability", "impact")]
+        return list(PARAMETER_FACTORS) + risk_factors
+
+    def base_value(self, factor: str) -> float:
+
+        """
+        Value of a factor in the base scenario.
+        """
+        if factor in PARAMETER_FACTORS:
+            return getattr(self.parameters, factor)
+        for risk in self.risks:
+            for field in ("probability", "impact"):
+                if factor == f"{risk.risk_name}.{field}":
+                    return getattr(risk, field)
+        raise ValueError(f"Unknown factor {factor}, must be one of {self.factors()}")
+
+    def scenario(self, changes: dict[str, float]) -> tuple[SimulationParameters, list[Risk]]:
+
+        """
+        Base scenario with some factors changed ({factor: new value}).
+        Raises ValueError/TypeError if the changed inputs are not valid.
+        """
+        for factor in changes:
+            self.base_value(factor) #validates the factor name
+
+        params = self.parameters.to_dict()
+        params.update({factor: value for factor, value in changes.items() if factor in PARAMETER_FACTORS})
+        params["num_sim"] = self.num_sim
+
+        risks = []
+        for risk in self.risks:
+            fields = risk.to_dict()
+            for field in ("probability", "impact"):
+                fields[field] = changes.get(f"{risk.risk_name}.{field}", fields[field])
+            risks.append(Risk.from_dict(fields))
+
+        return SimulationParameters.from_dict(params), risks
+
+    def one_at_a_time(self, steps: tuple = (-0.2, -0.1, 0.1, 0.2), factors: list[str] | None = None) -> list[dict]:
+
+        """
+        Sweep points that move one factor at a time by relative steps (0.1 = +10%).
+        Integer factors move at least one unit in the direction of the step, so small
+        values still change. Points whose inputs are not valid (e.g. th_min >= th_ex or a
+        probability outside (0, 1)) are left out.
+        """
+        points = []
+        for factor in factors or self.factors():
+            base = self.base_value(factor)
+            for step in steps:
+                if isinstance(base, int):
+                    value = base + int(np.sign(step)) * max(1, round(abs(base * step)))
+                else:
+                    value = round(base * (1 + step), 6)
+                points.append({"factor": factor, "step": step, "changes": {factor: value}})
+
+        return self._valid(points)
+
+    def grid(self, levels: dict[str, list]) -> list[dict]:
+
+        """
+        Full factorial sweep points: every combination of the given values
+        ({factor: [values]}). Invalid combinations are left out.
+        """
+        if not levels:
+            raise ValueError("levels must name at least one factor")
+        for factor in levels:
+            self.base_value(factor) #an unknown factor is an error, not an invalid point
+
+        points = []
+        for combination in itertools.product(*levels.values()):
+            changes = dict(zip(levels, combination))
+            points.append({"factor": "grid", "step": None, "changes": changes})
+
+        return self._valid(points)
+
+    def run(self, points: list[dict], workers: int = 1,
+            percentiles: tuple = (50, 85, 95)) -> list[dict]:
+
+        """
+        Simulates the base and every sweep point and returns one row per point with its
+        changes, its percentiles and their deltas against the base (P85 and delta_P85...).
+        """
+        if workers is None or workers < 1:
+            raise ValueError("workers must be a positive integer")
+
+        scenarios = [self.scenario({})] + [self.scenario(point["changes"]) for point in points]
+        settings = (self.seed, self.num_sim, self.block_weeks, self.memory_budget_mb, percentiles)
+
+        slices = np.array_split(np.arange(len(scenarios)), min(workers, len(scenarios)))
+        batches = [{str(i): scenarios[i] for i in ids} for ids in slices]
+        if len(batches) == 1:
+            parts = [_run_batch(batches[0], *settings)]
+        else:
+            with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+                parts = list(pool.map(_run_batch, batches, *zip(*[settings] * len(batches))))
+
+        table = np.concatenate(parts) #(scenarios, percentiles), base first
+        rows = []
+        for point, values in zip(points, table[1:]):
+            row = {"factor": point["factor"], "step": point["step"], "changes": point["changes"]}
+            for p, value, base in zip(percentiles, values, table[0]):
+                row[f"P{p}"] = float(value)
+                row[f"delta_P{p}"] = float(value - base)
+            rows.append(row)
+
+        return rows
+
+    def tornado(self, steps: tuple = (-0.1, 0.1), factors: list[str] | None = None, workers: int = 1,
+                percentiles: tuple = (50, 85, 95), rank_by: int = 85) -> list[dict]:
+
+        """
+        One-at-a-time sweep summarized as a tornado table: one row per factor with the
+        lowest and highest delta of every percentile across its steps, sorted by the swing
+        (highest - lowest delta) of the rank_by percentile, widest first.
+        """
+        if rank_by not in percentiles:
+            raise ValueError("rank_by must be one of the percentiles")
+
+        rows = self.run(self.one_at_a_time(steps, factors), workers, percentiles)
+
+        table = []
+        for factor in dict.fromkeys(row["factor"] for row in rows): #keeps the factor order
+            factor_rows = [row for row in rows if row["factor"] == factor]
+            entry = {"factor": factor, "base": self.base_value(factor)}
+            for p in percentiles:
+                deltas = [row[f"delta_P{p}"] for row in factor_rows]
+                entry[f"low_P{p}"] = min(deltas)
+                entry[f"high_P{p}"] = max(deltas)
+            entry["swing"] = entry[f"high_P{rank_by}"] - entry[f"low_P{rank_by}"]
+            table.append(entry)
+
+        return sorted(table, key=lambda entry: entry["swing"], reverse=True)
+
+    def _valid(self, points: list[dict]) -> list[dict]:
+
+        """
+        Keeps the points whose changed inputs pass the SimulationParameters and Risk validation.
+        """
+        valid = []
+        for point in points:
+            try:
+                self.scenario(point["changes"])
+            except (ValueError, TypeError):
+                continue
+            valid.append(point)
+        return valid
+
+
+def _run_batch(scenarios: dict, seed: int | None, num_sim: int, block_weeks: int, memory_budget_mb: float,
+               percentiles: tuple) -> np.ndarray:
+    """
+    Runs one slice of the sweep and returns its percentiles.
+    """
+    results = BatchSimulator(scenarios, seed=seed, memory_budget_mb=memory_budget_mb,
+                             block_weeks=block_weeks).run(num_sim)
+    return np.array([np.percentile(results[name], percentiles) for name in scenarios])
@@ -1,40 +1,178 @@
 import numpy as np
-import pandas as pd
+from .completion_histogram import CompletionHistogram
 
 class SimulationAnalyzer:
     """
     Analiza un único resultado de simulación Monte Carlo,
     donde cada valor es la semana de finalización ('completion_week').
+
+    Los cálculos se hacen con NumPy sobre una única copia ordenada de los resultados
+    (se ordena una sola vez, la primera vez que se necesita): percentiles, describe()
+    y z-scores salen de esa misma pasada. pandas solo se importa cuando se pide un
+    resultado en formato pandas (summary, overall_stats, filter_outliers, df).
+
+    Con un CompletionHistogram los percentiles, describe(), los momentos y la máscara
+    de outliers salen de los conteos por semana; solo df (y lo que usa pandas) expande
+    una semana por réplica.
     """
 
     def __init__(self, completion_weeks: np.ndarray):
         """
         :param completion_weeks: 1D array con la semana de entrega
-                                 de cada réplica de la simulación.
+                                 de cada réplica de la simulación,
+                                 o un CompletionHistogram con sus conteos.
+        """
+        self._sorted = None
+        self.histogram = None
+        if isinstance(completion_weeks, CompletionHistogram):
+            self.histogram = completion_weeks
+            self._weeks = None  # se expande solo si se pide
+        else:
+            self._weeks = np.asarray(completion_weeks)  # sin copiar ni cambiar el dtype
+        self._moments = None
+        self._df = None
+
+    # ========= NumPy =========
+
+    @property
+    def completion_weeks(self) -> np.ndarray:
+        """Semana de cada réplica (con un histograma, expandida la primera vez)."""
+        if self._weeks is None:
+            self._weeks = self._sorted = self.histogram.to_results()  # ya sale ordenado
+        return self._weeks
+
+    @property
+    def sorted_weeks(self) -> np.ndarray:
+        """Resultados ordenados, calculados una sola vez."""
+        if self._sorted is None:
+            self._sorted = np.sort(self.completion_weeks)
+        return self._sorted
+
+    def quantiles(self, qs) -> np.ndarray:
+        """
+        Cuantiles (entre 0 y 1) con interpolación lineal, igual que pandas/np.percentile,
+        leídos directamente de la copia ordenada (o de los conteos del histograma).
+        """
+        if self.histogram is not None:
+            if not self.histogram.num_sim:
+                return np.full(len(qs), np.nan)
+            return np.atleast_1d(self.histogram.percentile(np.asarray(qs, dtype=np.float64) * 100)).astype(np.float64)
+
+        data = self.sorted_weeks
+        if data.size == 0:
+            return np.full(len(qs), np.nan)
+
+        positions = np.asarray(qs, dtype=np.float64) * (data.size - 1)
+        low = np.floor(positions).astype(np.intp)
+        high = np.minimum(low + 1, data.size - 1)
+        low_values = data[low].astype(np.float64)
+        return low_values + (data[high] - low_values) * (positions - low)
+
+    def moments(self) -> tuple[float, float]:
+        """Media y desviación estándar poblacional (ddof=0), calculadas una vez."""
+        if self._moments is None and self.histogram is not None:
+            histogram = self.histogram
+            self._moments = (histogram.mean(), histogram.std(ddof=0)) if histogram.num_sim else (np.nan, np.nan)
+        if self._moments is None:
+            data = self.completion_weeks.astype(np.float64, copy=False)
+            self._moments = (float(data.mean()), float(data.std(ddof=0))) if data.size else (np.nan, np.nan)
+        return self._moments
+
+    def describe(self) -> dict:
+        """Lo mismo que overall_stats() pero como dict, sin pandas."""
+        if self.histogram is not None:
+            weeks = self.histogram.weeks  # sin semanas vacías en los extremos
+            n, lowest, highest = self.histogram.num_sim, weeks[:1], weeks[-1:]
+        else:
+            n, lowest, highest = self.sorted_weeks.size, self.sorted_weeks[:1], self.sorted_weeks[-1:]
+        mean, std = self.moments()
+        quartiles = self.quantiles((0.25, 0.5, 0.75))
+        return {
+            "count": float(n),
+            "mean": mean,
+            "std": std * np.sqrt(n / (n - 1)) if n > 1 else np.nan,  # ddof=1 como pandas
+            "min": float(lowest[0]) if n else np.nan,
+            "25%": float(quartiles[0]),
+            "50%": float(quartiles[1]),
+            "75%": float(quartiles[2]),
+            "max": float(highest[0]) if n else np.nan,
+        }
+
+    def percentiles(self, percentiles=(0.5, 0.9)) -> dict:
+        """Lo mismo que summary() pero como dict {'pXX': valor}, sin pandas."""
+        values = self.quantiles(percentiles)
+        return {f"p{int(p*100)}": float(value) for p, value in zip(percentiles, values)}
+
+    def percentile_intervals(self, percentiles=(0.5, 0.9), confidence=0.95, num_resamples=1000, seed=None) -> dict:
+        """
+        Intervalos de confianza bootstrap de cada percentil: {'pXX': (bajo, alto)}.
+        Remuestrea los conteos por semana con multinomial (ver CompletionHistogram), así
+        que el coste no depende del número de réplicas. Requiere semanas enteras.
+        """
+        histogram = self.histogram
+        if histogram is None:
+            if self.completion_weeks.dtype.kind not in "iu":
+                raise ValueError("Bootstrap intervals need integer completion weeks.")
+            histogram = CompletionHistogram.from_results(self.completion_weeks)
+        intervals = histogram.bootstrap_intervals([p * 100 for p in percentiles], confidence, num_resamples, seed)
+        return {f"p{int(p*100)}": interval for p, interval in zip(percentiles, intervals.values())}
+
+    def outlier_mask(self, z_thresh=3.0) -> np.ndarray:
         """
-        self.df = pd.DataFrame({
-            'sim_run': np.arange(len(completion_weeks)),  # réplica 0,1,2…
-            'completion_week': completion_weeks           # resultado por réplica
-        })
+        Máscara de las réplicas que están dentro de z_thresh z-scores. Con un histograma
+        se evalúa una vez por semana y se repite por sus conteos (réplicas en orden).
+        """
+        mean, std = self.moments()
+        if self.histogram is not None:
+            kept = np.abs((self.histogram.weeks - mean) / std) <= z_thresh
+            return np.repeat(kept, self.histogram.counts)
+        return np.abs((self.completion_weeks - mean) / std) <= z_thresh
+
+    # ========= pandas (mismas formas que antes) =========
+
+    @property
+    def df(self):
+        """DataFrame ['sim_run', 'completion_week'], construido solo si se usa."""
+        if self._df is None:
+            import pandas as pd
+
+            n = len(self.completion_weeks)
+            self._df = pd.DataFrame({
+                'sim_run': np.arange(n, dtype=np.min_scalar_type(max(n - 1, 0))),  # réplica 0,1,2…
+                'completion_week': self.completion_weeks      # resultado por réplica, sin copiar ni cambiar el dtype
+            }, copy=False)
+        return self._df
 
-    def summary(self, percentiles=(0.5, 0.9)) -> pd.DataFrame:
+    def summary(self, percentiles=(0.5, 0.9)):
         """
         Calcula los percentiles deseados de 'completion_week'.
         Devuelve un DataFrame con columnas ['pXX', ...].
         """
-        agg_kwargs = {
-            f"p{int(p*100)}": (lambda x, q=p: x.quantile(q))
-            for p in percentiles
-        }
-        return self.df['completion_week'].agg(**agg_kwargs).to_frame().T
+        import pandas as pd
+
+        return pd.DataFrame([self.percentiles(percentiles)], index=['completion_week'])
 
-    def overall_stats(self) -> pd.Series:
+    def summary_with_intervals(self, percentiles=(0.5, 0.9), confidence=0.95, num_resamples=1000, seed=None):
+        """
+        summary() con dos filas más, 'ci_low' y 'ci_high': el intervalo bootstrap
+        de cada percentil (ver percentile_intervals).
+        """
+        import pandas as pd
+
+        intervals = self.percentile_intervals(percentiles, confidence, num_resamples, seed)
+        return pd.DataFrame(
+            [self.percentiles(percentiles),
+             {key: low for key, (low, high) in intervals.items()},
+             {key: high for key, (low, high) in intervals.items()}],
+            index=['completion_week', 'ci_low', 'ci_high'],
+        )
+
+    def overall_stats(self):
         """Estadísticas descriptivas (count, mean, std, min, 25%, 50%, 75%, max)."""
-        return self.df['completion_week'].describe()
+        import pandas as pd
+
+        return pd.Series(self.describe(), name='completion_week', dtype=np.float64)
 
-    def filter_outliers(self, z_thresh=3.0) -> pd.DataFrame:
+    def filter_outliers(self, z_thresh=3.0):
         """Elimina las réplicas cuya completion_week esté fuera de z_thresh z-scores."""
-        arr = self.df['completion_week'].to_numpy()
-        mean, std = arr.mean(), arr.std(ddof=0)
-        mask = np.abs((arr - mean) / std) <= z_thresh
-        return self.df.loc[mask].reset_index(drop=True)
+        return self.df.loc[self.outlier_mask(z_thresh)].reset_index(drop=True)
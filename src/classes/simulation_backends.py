@@ -0,0 +1,149 @@
+"""
+Pluggable engines that draw the replicas of a Simulator.
+A backend receives the simulator (parameters, risks, memory budget...) plus the random
+generator of a shard and returns the completion week of every replica of that shard.
+The engine is chosen by name when the simulation is run; new engines can be added with
+register_backend.
+"""
+
+import importlib.util
+import math
+import warnings
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+class SimulationBackend(ABC):
+    """
+    Interface of a simulation engine.
+    """
+    name = None
+
+    def is_available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def simulate(self, simulator, rng: np.random.Generator, num_rows: int, block_weeks: int,
+                 max_weeks: int | None) -> np.ndarray:
+        ...
+
+
+class NumpyBackend(SimulationBackend):
+    """
+    Vectorized engine: adaptive week blocks over row chunks (the default).
+    """
+    name = "numpy"
+
+    def simulate(self, simulator, rng, num_rows, block_weeks, max_weeks):
+        return simulator._simulate_shard(rng, num_rows, block_weeks, max_weeks)
+
+
+class NumbaBackend(SimulationBackend):
+    """
+    Compiled per-replica loop (needs the optional numba package).
+    Every replica stops drawing at its completion week and only keeps its running
+    total, so the memory per replica is O(1). It draws independent pseudo-random
+    numbers in float64, so it supports sampling='random' only.
+    """
+    name = "numba"
+
+    def __init__(self):
+        self._kernel = None
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("numba") is not None
+
+    def simulate(self, simulator, rng, num_rows, block_weeks, max_weeks):
+        if simulator.sampling != "random":
+            raise ValueError("The numba engine only supports sampling='random'")
+
+        probabilities = np.array([risk.probability for risk in simulator.risks], dtype=np.float64)
+        impacts = np.array([risk.impact for risk in simulator.risks], dtype=np.float64)
+
+        results = self._load_kernel()(
+            rng,
+            num_rows,
+            float(simulator.parameters.backlog),
+            float(simulator.parameters.th_min),
+            float(simulator.parameters.th_ex),
+            float(simulator.parameters.th_max),
+            probabilities,
+            impacts,
+            -1 if max_weeks is None else max_weeks,
+        )
+        if results.size and results.min() < 0:
+            raise RuntimeError(f"Some replicas did not reach the backlog within {max_weeks} weeks")
+        return results
+
+    def _load_kernel(self):
+        """
+        Compiles the kernel on first use, so importing this module doesn't import numba.
+        """
+        if self._kernel is None:
+            import numba
+            self._kernel = numba.njit(cache=True)(_replica_loop)
+        return self._kernel
+
+
+def _replica_loop(rng, num_rows, backlog, left, mode, right, probabilities, impacts, max_weeks):
+    """
+    Plain Python version of the numba kernel (same model as Simulator): weekly triangular
+    throughput by inverse CDF, every risk hits independently and its impacts acumulate.
+    A replica that exceeds max_weeks (when max_weeks >= 0) is reported as -1.
+    """
+    results = np.empty(num_rows, dtype=np.int64)
+    left_share = (mode - left) / (right - left)
+
+    for replica in range(num_rows):
+        delivered = 0.0
+        week = 0
+        while delivered < backlog:
+            if 0 <= max_weeks <= week:
+                week = -1
+                break
+            u = rng.random()
+            if u < left_share:
+                throughput = left + math.sqrt(u * (right - left) * (mode - left))
+            else:
+                throughput = right - math.sqrt((1 - u) * (right - left) * (right - mode))
+            for risk in range(probabilities.size):
+                if rng.random() < probabilities[risk]:
+                    throughput *= impacts[risk]
+            delivered += throughput
+            week += 1
+        results[replica] = week
+
+    return results
+
+
+BACKENDS = {
+    "numpy": NumpyBackend(),
+    "numba": NumbaBackend(),
+}
+
+
+def register_backend(backend: SimulationBackend) -> None:
+    """
+    Makes a backend selectable by its name in Simulator.run_simulation(engine=...).
+    """
+    if not isinstance(backend, SimulationBackend) or not backend.name:
+        raise TypeError("backend must be a named SimulationBackend")
+    BACKENDS[backend.name] = backend
+
+
+def get_backend(name: str) -> SimulationBackend:
+    """
+    Returns the backend registered under name. If its optional dependency is missing
+    it warns and falls back to the numpy backend instead of failing.
+    """
+    if name == "analytic":
+        raise ValueError("engine='analytic' computes the distribution without sampling, "
+                         "only Simulator.run_simulation accepts it")
+    if name not in BACKENDS:
+        raise ValueError(f"engine must be one of {list(BACKENDS) + ['analytic']}")
+
+    backend = BACKENDS[name]
+    if not backend.is_available():
+        warnings.warn(f"The {name} engine is not available, falling back to numpy", RuntimeWarning)
+        return BACKENDS["numpy"]
+    return backend
@@ -1,75 +1,115 @@
+from __future__ import annotations
+
 import numpy as np
-import base64
 import io
-from fpdf import FPDF
-from simulation_analyzer import SimulationAnalyzer
-from simulation_visualizer import SimulationVisualizer
+from typing import TYPE_CHECKING
+from .simulation_analyzer import SimulationAnalyzer
+from .simulation_visualizer import SimulationVisualizer
+from .completion_histogram import CompletionHistogram
+
+if TYPE_CHECKING:
+    from fpdf import FPDF
 
 
 class SimulationReport:
     """
     Generates a consolidated PDF report from Monte Carlo simulation results,
     including statistical summaries and graphical visualizations.
+
+    Images go from the visualizer to FPDF as raw bytes in memory buffers (no base64, no
+    temporary files), and every call builds its own FPDF, so any number of reports can
+    be generated at the same time from threads or processes.
+    fpdf (like matplotlib in the visualizer) is imported on the first PDF, not on import.
+    The results can also be a CompletionHistogram; its report has no convergence page
+    (a histogram doesn't keep the replica order).
     """
 
-    def __init__(self, results: np.ndarray):
-        if not isinstance(results, np.ndarray):
-            raise ValueError("Results must be a NumPy array.")
+    #page title -> plot kind of SimulationVisualizer.PLOTS
+    PLOTS = {
+        "Histogram": "histogram",
+        "CDF": "cdf",
+        "Boxplot": "boxplot",
+        "Convergence": "convergence",
+    }
+
+    def __init__(self, results: np.ndarray | CompletionHistogram, cache=None):
+        if not isinstance(results, (np.ndarray, CompletionHistogram)):
+            raise ValueError("Results must be a NumPy array or a CompletionHistogram.")
         self.results = results
         self.analyzer = SimulationAnalyzer(results)
-        self.visualizer = SimulationVisualizer(results)
+        self.visualizer = SimulationVisualizer(results, cache=cache)
 
-    def _save_base64_image_to_tempfile(self, img_base64: str, filename: str) -> str:
+    def render_images(self, image_format: str = "png", pipeline=None) -> dict[str, bytes]:
         """
-        Decodes a base64 image string and saves it temporarily to disk
-        so it can be inserted into the PDF. Returns the file path.
+        Raw image bytes of every report plot, {title: bytes}. image_format "svg" gives
+        vector figures. With a RenderPipeline the independent plots are rendered
+        concurrently in its warm worker pool instead of one after another.
         """
-        img_bytes = base64.b64decode(img_base64)
-        path = f"{filename}.png"
-        with open(path, "wb") as f:
-            f.write(img_bytes)
-        return path
+        if image_format not in ("png", "svg"):
+            raise ValueError("image_format must be 'png' or 'svg'")
+
+        titles = {title: kind for title, kind in self.PLOTS.items()
+                  if not (kind == "convergence" and isinstance(self.results, CompletionHistogram))}
+        plots = {kind: {"format": image_format} for kind in titles.values()}
+        if pipeline is not None:
+            images = pipeline.render(self.visualizer, plots, encoded=False)
+        else:
+            images = {kind: self.visualizer.plot(kind, encoded=False, **options) for kind, options in plots.items()}
+        return {title: images[kind] for title, kind in titles.items()}
 
-    def generate_pdf(self, output_path: str = "simulation_report.pdf") -> None:
+    def generate_pdf(self, output_path: str | None = "simulation_report.pdf", pipeline=None,
+                     image_format: str = "png") -> bytes | None:
         """
         Generates a PDF file with summary statistics and visualizations
         from the simulation results.
+        With output_path=None nothing is written and the PDF bytes are returned.
         """
+        from fpdf import FPDF
+
+        images = self.render_images(image_format, pipeline)
+
         pdf = FPDF()
         pdf.set_auto_page_break(auto=True, margin=15)
+        self.add_pages(pdf, "Monte Carlo Simulation Report", self.summary_stats(), images)
+
+        # Save PDF
+        if output_path is None:
+            return bytes(pdf.output())
+        pdf.output(output_path)
+        return None
+
+    def summary_stats(self) -> dict:
+        """
+        Statistics printed in the report: describe() plus P5 and P95.
+        """
+        stats = self.analyzer.describe()  # same values as overall_stats()/summary(), one sort, no pandas
+        percentiles = self.analyzer.percentiles(percentiles=(0.05, 0.95))
+        stats.update(percentiles)
+        return stats
+
+    @staticmethod
+    def add_pages(pdf: FPDF, title: str, stats: dict, images: dict[str, bytes]) -> None:
+        """
+        Adds the report pages (statistics page, then one page per image) to pdf, so
+        several reports can share one document (see BatchReportGenerator).
+        """
         pdf.add_page()
 
         # Title
         pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, "Monte Carlo Simulation Report", ln=True)
+        pdf.cell(0, 10, title, ln=True)
 
         # Statistics
         pdf.set_font("Arial", size=12)
         pdf.ln(5)
         pdf.cell(0, 10, "Summary Statistics:", ln=True)
 
-        stats = self.analyzer.overall_stats().to_dict()
-        percentiles = self.analyzer.summary(percentiles=(0.05, 0.95)).to_dict(orient="records")[0]
-        stats.update(percentiles)
-
         for key, val in stats.items():
             pdf.cell(0, 10, f"{key}: {val:.2f}", ln=True)
 
         # Graphs
-        plot_funcs = {
-            "Histogram": lambda: self.visualizer._plot_histogram(show=False),
-            "CDF": self.visualizer.plot_cdf,
-            "Boxplot": self.visualizer.plot_boxplot,
-            "Convergence": self.visualizer.plot_convergence
-        }
-
-        for title, plot_func in plot_funcs.items():
-            image_base64 = plot_func()
-            image_path = self._save_base64_image_to_tempfile(image_base64, f"temp_{title}")
+        for image_title, image in images.items():
             pdf.add_page()
             pdf.set_font("Arial", "B", 14)
-            pdf.cell(0, 10, title, ln=True)
-            pdf.image(image_path, x=15, w=180)
-
-        # Save PDF
-        pdf.output(output_path)
+            pdf.cell(0, 10, image_title, ln=True)
+            pdf.image(io.BytesIO(image), x=15, w=180)  # straight from memory
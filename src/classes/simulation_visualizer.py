@@ -1,101 +1,322 @@
+from __future__ import annotations
+
 import os
 os.environ.setdefault("MPLBACKEND", "Agg")  # backend without GUI
 
 import io
 import base64
+import inspect
+import threading
+from typing import TYPE_CHECKING
 import numpy as np
 
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+from .convergence import convergence_series
+from .completion_histogram import CompletionHistogram
+from .byte_cache import ByteCache, content_key
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
 
 class SimulationVisualizer:
     """
     Generates all the visualizations from simulation results
     and returns them as base64-encoded images ready to be sent to the frontend by an API.
+
+    Every plot takes a format: "png" (base64 PNG, the default), "svg" (SVG text, vector
+    output) or "data" (a dict of compact arrays so the frontend can draw the chart itself,
+    no rendering at all). With encoded=False png and svg plots return the raw image bytes
+    instead (e.g. to embed them in a PDF without a base64 round trip).
+
+    With a ByteCache, every rendered PNG is stored under a hash of the results, the plot
+    kind and its options, so the same plot of the same results skips Agg entirely.
+    Plots that don't depend on the replica order (histogram, CDF) are keyed by the week
+    counts, so any ordering of the same results hits; the convergence plot is keyed by
+    the raw results.
+
+    matplotlib is only imported when the first figure is rendered, so importing this
+    module (e.g. from the API) stays cheap; format="data" never imports it.
+
+    The results can also be a CompletionHistogram: every plot but the convergence one
+    (which needs the replica order) is drawn from its week counts, never one value per
+    replica.
     """
 
-    def __init__(self, results: np.ndarray):
+    #plot kind -> (method, whether the plot depends on the replica order)
+    PLOTS = {
+        "histogram": ("_plot_histogram", False),
+        "cdf": ("plot_cdf", False),
+        "convergence": ("plot_convergence", True),
+        "boxplot": ("plot_boxplot", False),
+    }
+
+    FORMATS = ("png", "svg", "data")
+
+    _templates = threading.local()  # one reusable Figure per thread (or worker process)
+
+    def __init__(self, results: np.ndarray | CompletionHistogram, cache: ByteCache | None = None):
         """
-        Creates an object that has the array results as the main attribute
+        Creates an object that has the array results (or histogram) as the main attribute
         not before validating its structure and data type.
         """
-        if not isinstance(results, np.ndarray):
-            raise ValueError("Results must be a NumPy array.")
-        if results.ndim != 1:
-            raise ValueError("Results must be a 1-dimensional array.")
-        if results.size < 2:
-            raise ValueError("Results array must contain at least two values.")
-        if not np.isfinite(results).all():
-            raise ValueError("Results contain NaN or infinite values.")
+        if isinstance(results, CompletionHistogram):
+            if results.num_sim < 2:
+                raise ValueError("Results histogram must contain at least two values.")
+        else:
+            if not isinstance(results, np.ndarray):
+                raise ValueError("Results must be a NumPy array or a CompletionHistogram.")
+            if results.ndim != 1:
+                raise ValueError("Results must be a 1-dimensional array.")
+            if results.size < 2:
+                raise ValueError("Results array must contain at least two values.")
+            if results.dtype.kind == "f" and not np.isfinite(results).all():  # integer weeks are always finite
+                raise ValueError("Results contain NaN or infinite values.")
 
         self.results = results
+        self.histogram = results if isinstance(results, CompletionHistogram) else None
+        self.cache = cache
+        self._digests = {}
+        self._counts = None
 
     # ========= internal helpers =========
 
+    def _digest(self, ordered: bool) -> str:
+        """
+        Hash of the results: of the raw array if the plot depends on the replica order,
+        of the week counts otherwise (an O(n) bincount, the same key for an array of
+        integer weeks and its CompletionHistogram; float results are sorted). Computed once.
+        """
+        if ordered not in self._digests:
+            self._require_order(ordered)
+            histogram = self.histogram
+            if histogram is None and not ordered and self.results.dtype.kind in "iu":
+                histogram = CompletionHistogram.from_results(self.results)
+            if ordered:
+                self._digests[ordered] = content_key(self.results)
+            elif histogram is not None:
+                self._digests[ordered] = content_key("histogram", histogram.first_week, histogram.counts)
+            else:
+                self._digests[ordered] = content_key(np.sort(self.results))
+        return self._digests[ordered]
+
+    def _require_order(self, ordered: bool = True) -> None:
+        if ordered and self.histogram is not None:
+            raise ValueError("This plot needs the results in replica order, a CompletionHistogram doesn't keep it.")
+
+    def _value_counts(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (distinct values, replicas of each), from the histogram or from the results.
+        """
+        if self._counts is None:
+            if self.histogram is not None:
+                filled = self.histogram.counts > 0
+                self._counts = (self.histogram.weeks[filled], self.histogram.counts[filled])
+            else:
+                self._counts = np.unique(self.results, return_counts=True)
+        return self._counts
+
+    def _percentile(self, q):
+        """np.percentile of the results (or the same value from the histogram counts)."""
+        if self.histogram is not None:
+            return self.histogram.percentile(q)
+        return np.percentile(self.results, q)
+
+    def cache_key(self, kind: str, options: dict | None = None) -> str:
+        """
+        Cache key of a plot: kind, every option of its method (defaults filled in) and the
+        digest of the results it depends on. Lets a caller (e.g. RenderPipeline) check
+        the cache before rendering elsewhere.
+        """
+        if kind not in self.PLOTS:
+            raise ValueError(f"kind must be one of {list(self.PLOTS)}")
+        method, ordered = self.PLOTS[kind]
+        bound = inspect.signature(getattr(self, method)).bind(**(options or {}))
+        bound.apply_defaults()
+        arguments = {name: value for name, value in bound.arguments.items() if name not in ("show", "encoded")}
+        return content_key("plot", kind, arguments, self._digest(ordered))
+
+    def plot(self, kind: str, **options) -> str | dict:
+        """
+        Renders a plot by kind ('histogram', 'cdf', 'convergence', 'boxplot') in its format option.
+        """
+        if kind not in self.PLOTS:
+            raise ValueError(f"kind must be one of {list(self.PLOTS)}")
+        return getattr(self, self.PLOTS[kind][0])(**options)
+
+    def _render(self, kind: str, options: dict, draw, encoded: bool = True) -> str | bytes:
+        """
+        Returns the plot as base64 PNG or SVG text (options["format"]), or as the raw bytes
+        if not encoded, from the cache if possible. draw(fig) fills the figure and is only
+        called (and rendered) on a cache miss.
+        """
+        image_format = options["format"]
+        if image_format not in ("png", "svg"):
+            raise ValueError(f"format must be one of {list(self.FORMATS)}")
+
+        def render() -> bytes:
+            fig = self._template_figure()
+            try:
+                draw(fig)
+                return self._render_png(fig) if image_format == "png" else self._render_svg(fig)
+            finally:
+                fig.clf()  # the template is left clean even if draw fails
+
+        if self.cache is None:
+            image = render()
+        else:
+            image = self.cache.get_or_compute(self.cache_key(kind, options), render)
+        return self.encode(image, image_format) if encoded else image
+
+    @staticmethod
+    def encode(image: bytes, image_format: str) -> str:
+        """Rendered bytes -> what the plot methods return (base64 for PNG, text for SVG)."""
+        return base64.b64encode(image).decode("utf-8") if image_format == "png" else image.decode("utf-8")
+
     @staticmethod
-    def _render_plot_to_base64(fig: Figure) -> str:
+    def decode(image: str, image_format: str) -> bytes:
+        """Inverse of encode, e.g. to cache what a worker returned."""
+        return base64.b64decode(image) if image_format == "png" else image.encode("utf-8")
+
+    @classmethod
+    def _template_figure(cls) -> Figure:
+        """
+        Figure (with its Agg canvas) reused by every plot of this thread: _render_png
+        clears it after rendering, so only the first plot pays the setup.
+        """
+        if getattr(cls._templates, "figure", None) is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+
+            cls._templates.figure = Figure(figsize=(10, 6))
+            FigureCanvas(cls._templates.figure)
+        return cls._templates.figure
+
+    @staticmethod
+    def _render_png(fig: Figure) -> bytes:
         """
-        Renders a Matplotlib Figure to PNG (in-memory) and returns a base64 string.
+        Renders a Matplotlib Figure to PNG bytes (in-memory).
         """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+
         buf = io.BytesIO()
-        FigureCanvas(fig).print_png(buf)  # render with Agg
-        img_base64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-        buf.close()
+        canvas = fig.canvas if isinstance(fig.canvas, FigureCanvas) else FigureCanvas(fig)
+        canvas.print_png(buf)  # render with Agg
         fig.clf()
-        return img_base64
+        return buf.getvalue()
+
+    @staticmethod
+    def _render_svg(fig: Figure) -> bytes:
+        """
+        Renders a Matplotlib Figure to SVG bytes (vector, no rasterizing).
+        """
+        buf = io.BytesIO()
+        fig.savefig(buf, format="svg")
+        fig.clf()
+        return buf.getvalue()
+
+    def _markers(self) -> dict:
+        """P50/P85/P95 marker values shown on the plots."""
+        values = self._percentile([50, 85, 95])
+        return {f"P{p}": float(value) for p, value in zip([50, 85, 95], values)}
+
+    def _convergence_steps(self, step: int, percentile: float, confidence: float) -> tuple:
+        """
+        Convergence series reduced to the points where the estimate or its band changes.
+        The curves are flat most of the time, so drawing them as steps through these
+        points gives the same picture with far fewer vertices.
+        """
+        series = convergence_series(self.results, percentile=percentile, confidence=confidence, step=step)
+        lines = np.stack([series["percentile"], series["low"], series["high"]])
+        changes = np.flatnonzero((np.diff(lines, axis=1) != 0).any(axis=0)) + 1
+        kept = np.concatenate([[0], changes, [lines.shape[1] - 1]])
+        return (series["n"][kept], *lines[:, kept])
+
+    def _boxplot_stats(self) -> dict:
+        """
+        Box plot statistics with Matplotlib's rules (quartiles with linear interpolation,
+        whiskers at the furthest values within 1.5 IQR of the box). The fliers are the
+        distinct outlying values, not one marker per replica.
+        """
+        values, counts = self._value_counts()
+        q1, median, q3 = self._percentile([25, 50, 75])
+        iqr = q3 - q1
+        within = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+        inside = values[within]
+        return {
+            "q1": float(q1), "med": float(median), "q3": float(q3), "mean": float(np.dot(values, counts) / counts.sum()),
+            "whislo": float(inside.min()), "whishi": float(inside.max()),
+            "fliers": values[~within].astype(np.float64), "flier_counts": counts[~within],
+        }
 
     # ========= public plots =========
 
-    def _plot_histogram(self, bins: int = 30, show: bool = False) -> str:
+    def _plot_histogram(self, bins: int = 30, show: bool = False, format: str = "png",
+                        encoded: bool = True) -> str | bytes | dict:
         """
         Creates a histogram with useful percentiles and returns it as base64.
-       
+        format="data" returns the bin edges, counts and percentile markers instead.
         """
-        fig = Figure(figsize=(10, 6))
-        ax = fig.add_subplot(1, 1, 1)
+        if format == "data":
+            values, counts = self._value_counts()
+            bin_counts, edges = np.histogram(values, bins=bins, weights=counts)
+            return {"edges": edges.tolist(), "counts": bin_counts.astype(np.int64).tolist(), "markers": self._markers()}
+
+        def draw(fig: Figure) -> None:
+            values, counts = self._value_counts()
+            ax = fig.add_subplot(1, 1, 1)
 
-        ax.hist(self.results, bins=bins, edgecolor='black', alpha=0.75)
-        ax.set_title("Completion Time")
-        ax.set_xlabel("Weeks to Completion")
-        ax.set_ylabel("Frequency")
-        ax.grid(True, alpha=0.25)
+            ax.hist(values, bins=bins, weights=counts, edgecolor='black', alpha=0.75)
+            ax.set_title("Completion Time")
+            ax.set_xlabel("Weeks to Completion")
+            ax.set_ylabel("Frequency")
+            ax.grid(True, alpha=0.25)
 
-        for p, color in zip([50, 85, 95], ['blue', 'green', 'red']):
-            val = np.percentile(self.results, p)
-            ax.axvline(val, color=color, linestyle='--', label=f'P{p}: {val:.1f} weeks')
+            for (label, val), color in zip(self._markers().items(), ['blue', 'green', 'red']):
+                ax.axvline(val, color=color, linestyle='--', label=f'{label}: {val:.1f} weeks')
 
-        ax.legend()
-        return self._render_plot_to_base64(fig)
+            ax.legend()
 
-    def plot_cdf(self) -> str:
+        return self._render("histogram", {"bins": bins, "format": format}, draw, encoded)
+
+    def plot_cdf(self, format: str = "png", encoded: bool = True) -> str | bytes | dict:
         """
         Creates the CDF plot and returns it as base64.
+        format="data" returns the CDF steps (each distinct week and the share of replicas
+        finished by then) and the percentile markers instead.
         """
-        sorted_vals = np.sort(self.results)
-        probs = np.linspace(0, 1, len(sorted_vals), endpoint=True)
+        if format == "data":
+            weeks, counts = self._value_counts()
+            return {"x": weeks.tolist(), "cdf": (np.cumsum(counts) / counts.sum()).tolist(), "markers": self._markers()}
+
+        def draw(fig: Figure) -> None:
+            weeks, counts = self._value_counts()
+            cdf = np.cumsum(counts) / counts.sum()
+            ax = fig.add_subplot(1, 1, 1)
 
-        fig = Figure(figsize=(10, 6))
-        ax = fig.add_subplot(1, 1, 1)
+            ax.step(weeks, cdf, where='post')
+            ax.set_title("Cumulative Distribution Function (CDF)")
+            ax.set_xlabel("Weeks to Completion")
+            ax.set_ylabel("Cumulative Probability")
+            ax.set_ylim(0, 1)
+            ax.grid(True, alpha=0.25)
 
-        ax.step(sorted_vals, probs, where='post')
-        ax.set_title("Cumulative Distribution Function (CDF)")
-        ax.set_xlabel("Weeks to Completion")
-        ax.set_ylabel("Cumulative Probability")
-        ax.set_ylim(0, 1)
-        ax.grid(True, alpha=0.25)
+            for (label, val), color in zip(self._markers().items(), ['blue', 'green', 'red']):
+                ax.axvline(val, color=color, linestyle='--', label=f'{label}: {val:.1f} weeks')
 
-        for p, color in zip([50, 85, 95], ['blue', 'green', 'red']):
-            val = np.percentile(self.results, p)
-            ax.axvline(val, color=color, linestyle='--', label=f'P{p}: {val:.1f} weeks')
+            ax.legend()
 
-        ax.legend()
-        return self._render_plot_to_base64(fig)
+        return self._render("cdf", {"format": format}, draw, encoded)
 
-    def plot_convergence(self, step: int = 200) -> str:
+    def plot_convergence(self, step: int = 1, percentile: float = 85, confidence: float = 0.95,
+                         format: str = "png", encoded: bool = True) -> str | bytes | dict:
         """
-        Convergence of the P85 estimate vs number of simulations. Returns base64.
+        Convergence of the percentile estimate (P85 by default) vs number of simulations,
+        with its confidence band. The series is computed incrementally at every step-th
+        replica (every replica by default) in linear time, see convergence.py. Returns base64.
+        format="data" returns the steps of the series (n, estimate, low, high) instead.
+        Not available for a CompletionHistogram (it has no replica order).
         """
+        self._require_order()
         if step < 1:
             raise ValueError("Step must be a positive integer.")
 
@@ -103,21 +324,46 @@ class SimulationVisualizer:
         if num_points < 2:
             raise ValueError("Not enough data points to analyze convergence.")
 
-        x_vals = []
-        y_vals = []
-        for i in range(1, num_points + 1):
-            current_subset = self.results[:i * step]
-            percentile_85 = np.percentile(current_subset, 85)
-            x_vals.append(i * step)
-            y_vals.append(percentile_85)
+        if format == "data":
+            n, estimate, low, high = self._convergence_steps(step, percentile, confidence)
+            return {"n": n.tolist(), "estimate": estimate.tolist(), "low": low.tolist(), "high": high.tolist(),
+                    "percentile": percentile, "confidence": confidence}
+
+        def draw(fig: Figure) -> None:
+            n, estimate, low, high = self._convergence_steps(step, percentile, confidence)
+
+            ax = fig.add_subplot(1, 1, 1)
+
+            ax.fill_between(n, low, high, step="post", alpha=0.25, label=f"{confidence:.0%} band")
+            ax.plot(n, estimate, drawstyle="steps-post", label=f"P{percentile:g} estimate")
+            ax.set_title(f"Convergence of P{percentile:g} Estimate")
+            ax.set_xlabel("Number of Simulations")
+            ax.set_ylabel(f"P{percentile:g} Completion Time (weeks)")
+            ax.grid(True, alpha=0.25)
+            ax.legend()
+
+        options = {"step": step, "percentile": percentile, "confidence": confidence, "format": format}
+        return self._render("convergence", options, draw, encoded)
+
+    def plot_boxplot(self, format: str = "png", encoded: bool = True) -> str | bytes | dict:
+        """
+        Horizontal box plot of the completion weeks (box, whiskers at 1.5 IQR, mean and
+        outliers) and returns it as base64.
+        format="data" returns the box statistics and the outlying weeks with their counts.
+        """
+        if format == "data":
+            stats = self._boxplot_stats()
+            return {**stats, "fliers": stats["fliers"].tolist(), "flier_counts": stats["flier_counts"].tolist()}
 
-        fig = Figure(figsize=(10, 6))
-        ax = fig.add_subplot(1, 1, 1)
+        def draw(fig: Figure) -> None:
+            ax = fig.add_subplot(1, 1, 1)
 
-        ax.plot(x_vals, y_vals, marker='o')
-        ax.set_title("Convergence of P85 Estimate")
-        ax.set_xlabel("Number of Simulations")
-        ax.set_ylabel("P85 Completion Time (weeks)")
-        ax.grid(True, alpha=0.25)
+            #bxp draws precomputed stats: one flier per distinct week instead of per replica
+            ax.bxp([{**self._boxplot_stats(), "label": ""}], orientation="horizontal", showmeans=True,
+                   patch_artist=True, boxprops={"alpha": 0.75})
+            ax.set_title("Completion Time Spread")
+            ax.set_xlabel("Weeks to Completion")
+            ax.set_yticks([])
+            ax.grid(True, axis="x", alpha=0.25)
 
-        return self._render_plot_to_base64(fig)
+        return self._render("boxplot", {"format": format}, draw, encoded)
@@ -1,6 +1,19 @@
+import math
+from statistics import NormalDist
 import numpy as np
 from .simulation_params import SimulationParameters
 from .risk_class import Risk
+from .analytic_engine import completion_week_pmf, quantile_replicas
+from .simulation_backends import get_backend
+from .completion_histogram import CompletionHistogram
+from .streaming_stats import StreamingStats
+
+SAMPLINGS = ("random", "antithetic", "lhs", "sobol")
+
+PRECISIONS = { #dtype of the throughput matrices and of the completion weeks returned
+    "float64": {"float": np.float64, "weeks": np.int64},
+    "float32": {"float": np.float32, "weeks": np.uint16},
+}
 
 class Simulator:
 
@@ -11,49 +24,421 @@ class Simulator:
     It is important to note that in this model the risks acumulates.
     """
 
-    def __init__(self, parameters: SimulationParameters, risks: list[Risk]):
+    SHARD_SIZE = 50_000 #replicas per independent random stream, part of the seed contract
+
+    def __init__(self, parameters: SimulationParameters, risks: list[Risk], memory_budget_mb: float = 256,
+                 precision: str = "float64", seed: int | None = None, sampling: str = "random"):
+
+        if memory_budget_mb is None or not memory_budget_mb > 0:
+            raise ValueError("memory_budget_mb must be a positive number")
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {list(PRECISIONS)}")
+        if sampling not in SAMPLINGS:
+            raise ValueError(f"sampling must be one of {list(SAMPLINGS)}")
 
         self.parameters = parameters
         self.risks = risks
+        self.memory_budget_mb = memory_budget_mb
+        self.precision = precision
+        self.dtype = PRECISIONS[precision]["float"]
+        self.weeks_dtype = PRECISIONS[precision]["weeks"]
+        self.sampling = sampling
+        self.seed_sequence = np.random.SeedSequence(seed)
         self.results = None
 
-    def run_simulation(self, max_weeks: int = 150) -> np.ndarray:
+    def run_simulation(self, max_weeks: int | None = None, block_weeks: int | None = None,
+                       workers: int = 1, engine: str = "numpy", grid_points: int = 100) -> np.ndarray:
 
         """
-        Takes the user input parameters and run the simulation to get the throughput base.
-        After that it applies risks.
+        Takes the user input parameters and runs the simulation block of weeks by block of weeks.
+        Each block draws the throughput base only for the replicas that are still running,
+        applies risks and carries the accumulated throughput forward, so a replica is retired
+        as soon as it reaches the backlog. The horizon is extended until every replica finishes.
+
+        Replicas are processed in row chunks sized from memory_budget_mb, so only the
+        integer completion weeks of every chunk are kept and the peak memory doesn't
+        grow with num_sim.
+
+        num_sim is split into shards of SHARD_SIZE replicas and every shard gets its own
+        generator spawned from the simulator's SeedSequence. With workers > 1 the shards
+        run in a process pool (memory_budget_mb applies to each process) and are merged
+        in shard order, so a seed gives the same results for any number of workers.
+
+        max_weeks is an optional safety cap: if some replica has not finished by then a
+        RuntimeError is raised instead of reporting a wrong completion week.
+        block_weeks overrides the size of the first block (by default it's derived from the
+        expected completion time).
+
+        engine picks the backend that draws the replicas (see simulation_backends):
+        "numpy" (vectorized, default), "numba" (compiled per-replica loop, falls back to
+        numpy with a warning if numba isn't installed) or any registered backend.
+        engine="analytic" skips sampling: the completion week distribution is computed
+        exactly (see completion_distribution) and returned as num_sim evenly spaced quantiles.
         """
-        backlog = self.parameters.backlog
-        th_min = self.parameters.th_min
-        th_ex = self.parameters.th_ex
-        th_max = self.parameters.th_max
         num_sim = self.parameters.num_sim
 
-        th_base = np.random.triangular(
-            left=th_min,
-            mode=th_ex,
-            right=th_max,
-            size=(num_sim, max_weeks)
-        )
+        if engine == "analytic":
+            weeks, probabilities = self.completion_distribution(grid_points)
+            if max_weeks is not None and weeks[-1] > max_weeks:
+                raise RuntimeError(f"Some replicas do not reach the backlog within {max_weeks} weeks")
+            self.results = compact_weeks(quantile_replicas(weeks, probabilities, num_sim), self.weeks_dtype)
+            return self.results
+
+        if max_weeks is not None and max_weeks < 1:
+            raise ValueError("max_weeks must be a positive integer")
+        if block_weeks is None:
+            block_weeks = self._initial_horizon()
+        elif block_weeks < 1:
+            raise ValueError("block_weeks must be a positive integer")
+        if workers is None or workers < 1:
+            raise ValueError("workers must be a positive integer")
 
-        th_adjusted = self._apply_risks(th_base) #apply risks
-        th_accumulated = np.cumsum(th_adjusted, axis=1) #acumulates the throughput along the rows.
-        th_reached = th_accumulated >= backlog #creates a boolean ndarray (mask)
-        self.results = np.argmax(th_reached, axis=1) + 1 #finds the column where th_accumulated = backlog
+        self.results = self._sample(num_sim, block_weeks, max_weeks, workers, engine)
 
         return self.results
 
-    def _apply_risks(self, th_base_matrix: np.ndarray) -> np.ndarray:
+    def run_until_precision(self, target_half_width: float = 0.5, percentile: float = 85,
+                            confidence: float = 0.95, batch_size: int | None = None,
+                            max_sim: int = 1_000_000, workers: int = 1, engine: str = "numpy",
+                            interval: str = "order") -> dict:
+
+        """
+        Runs successive batches of replicas until the confidence interval of the given
+        percentile is narrow enough (half width <= target_half_width weeks) or max_sim
+        replicas have been used, instead of guessing num_sim up front.
+        The first batch has batch_size replicas (num_sim by default); the next ones are
+        sized from how far the interval is from the target, at most doubling the total.
+        interval picks how the interval is computed: "order" (order statistics, the default)
+        or "bootstrap" (multinomial bootstrap of the week counts, see
+        CompletionHistogram.bootstrap_intervals).
+
+        Returns a dict with the results and how the run ended: replicas used,
+        percentile estimate, achieved interval and whether the target was reached.
+        """
+        if target_half_width is None or not target_half_width > 0:
+            raise ValueError("target_half_width must be a positive number")
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        if interval not in ("order", "bootstrap"):
+            raise ValueError("interval must be 'order' or 'bootstrap'")
+        if engine == "analytic":
+            raise ValueError("engine='analytic' has no sampling error to shrink, use run_simulation(engine='analytic')")
+        if batch_size is None:
+            batch_size = self.parameters.num_sim
+        if batch_size < 1 or max_sim < 1:
+            raise ValueError("batch_size and max_sim must be positive integers")
+
+        block_weeks = self._initial_horizon()
+        batches = []
+        num_sim = 0
+        next_batch = min(batch_size, max_sim)
+
+        while True:
+            batches.append(self._sample(next_batch, block_weeks, None, workers, engine))
+            num_sim += next_batch
+            results = np.concatenate(batches) if len(batches) > 1 else batches[0]
+            batches = [results]
+
+            if interval == "bootstrap":
+                histogram = CompletionHistogram.from_results(results)
+                ci_low, ci_high = histogram.bootstrap_intervals([percentile], confidence, seed=self.seed_sequence.entropy)[percentile]
+            else:
+                ci_low, ci_high = self._percentile_interval(results, percentile, confidence)
+            half_width = (ci_high - ci_low) / 2
+            if half_width <= target_half_width or num_sim >= max_sim:
+                break
+
+            needed = num_sim * (half_width / target_half_width) ** 2 #the interval shrinks like 1/sqrt(n)
+            next_batch = int(min(max(needed - num_sim, batch_size), num_sim, max_sim - num_sim))
+
+        self.results = results
+
+        return {
+            "results": results,
+            "num_sim": num_sim,
+            "percentile": percentile,
+            "estimate": float(np.percentile(results, percentile)),
+            "ci_low": float(ci_low),
+            "ci_high": float(ci_high),
+            "half_width": float(half_width),
+            "confidence": confidence,
+            "target_reached": bool(half_width <= target_half_width),
+        }
+
+    def run_streaming(self, num_sim: int, batch_size: int | None = None, stats: StreamingStats | None = None,
+                      workers: int = 1, engine: str = "numpy", on_batch=None) -> StreamingStats:
+
+        """
+        Runs num_sim more replicas in batches of batch_size (num_sim of the parameters by
+        default) and feeds every batch to a StreamingStats (running moments + quantile
+        sketch) instead of keeping the results, so memory doesn't grow with num_sim.
+        self.results is left untouched.
+
+        Pass the stats of a previous run (e.g. StreamingStats.from_dict of a checkpoint)
+        to resume it: the simulator continues that run's random streams, so the resumed
+        replicas are new ones and a run split in pieces gives the same stats as one run.
+        on_batch(stats) is called after every batch, e.g. to save stats.to_dict().
+        """
+        if num_sim is None or num_sim < 1:
+            raise ValueError("num_sim must be a positive integer")
+        if batch_size is None:
+            batch_size = self.parameters.num_sim
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        if engine == "analytic":
+            raise ValueError("engine='analytic' doesn't draw replicas to stream, use run_simulation(engine='analytic')")
+
+        if stats is None:
+            stats = StreamingStats(seed=self.seed_sequence.entropy) #the sketch compactions follow the seed too
+        elif stats.seed_state is not None:
+            self.seed_sequence = np.random.SeedSequence(
+                stats.seed_state["entropy"], n_children_spawned=stats.seed_state["spawned"]
+            )
+
+        block_weeks = self._initial_horizon()
+        for start in range(0, num_sim, batch_size):
+            stats.update(self._sample(min(batch_size, num_sim - start), block_weeks, None, workers, engine))
+            stats.seed_state = {
+                "entropy": self.seed_sequence.entropy,
+                "spawned": self.seed_sequence.n_children_spawned,
+            }
+            if on_batch is not None:
+                on_batch(stats)
+
+        return stats
+
+    @staticmethod
+    def _percentile_interval(results: np.ndarray, percentile: float, confidence: float) -> tuple[float, float]:
+
+        """
+        Distribution free confidence interval of a percentile: the order statistics whose
+        ranks are n*p -/+ z*sqrt(n*p*(1-p)) (normal approximation of the binomial).
+        """
+        n = results.size
+        p = percentile / 100
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        spread = z * math.sqrt(n * p * (1 - p))
+        low = min(max(math.floor(n * p - spread), 0), n - 1)
+        high = min(max(math.ceil(n * p + spread), 0), n - 1)
+
+        ranked = np.partition(results, (low, high))
+        return ranked[low], ranked[high]
+
+    def _sample(self, num_sim: int, block_weeks: int, max_weeks: int | None, workers: int,
+                engine: str = "numpy") -> np.ndarray:
+
+        """
+        Draws num_sim replicas with the engine's backend, in shards with their own spawned generators.
+        """
+        engine = get_backend(engine).name #resolves the fallback once, before spawning shards
+        shard_sizes = [min(self.SHARD_SIZE, num_sim - start) for start in range(0, num_sim, self.SHARD_SIZE)]
+        shard_seeds = self.seed_sequence.spawn(len(shard_sizes))
+        shard_args = [
+            (self._settings(), engine, size, seed, block_weeks, max_weeks)
+            for size, seed in zip(shard_sizes, shard_seeds)
+        ]
+
+        if workers == 1 or len(shard_args) == 1:
+            shards = [_run_shard(*args) for args in shard_args]
+        else:
+            from concurrent.futures import ProcessPoolExecutor #pulls multiprocessing in, only when needed
+
+            with ProcessPoolExecutor(max_workers=min(workers, len(shard_args))) as pool:
+                shards = list(pool.map(_run_shard, *zip(*shard_args))) #map keeps the shard order
+
+        return np.concatenate(shards)
+
+    def completion_distribution(self, grid_points: int = 100) -> tuple[np.ndarray, np.ndarray]:
 
         """
-        Apply risks to the throughput base not before creating a copy of it 
-        for safely data manipulation
+        Exact completion week distribution of the model (no Monte Carlo noise), computed by
+        convolving the discretized weekly throughput. grid_points sets the grid resolution
+        used for th_max: more points means more accuracy and more time.
+        Returns (weeks, probabilities).
         """
-        adjusted = th_base_matrix.copy()
+        return completion_week_pmf(self.parameters, self.risks, grid_points)
+
+    def _simulate_shard(self, rng: np.random.Generator, num_rows: int, block_weeks: int,
+                        max_weeks: int | None) -> np.ndarray:
+
+        """
+        Runs num_rows replicas with the given generator, in row chunks that fit the memory budget.
+        """
+        chunk_rows = self._chunk_rows(block_weeks)
+        chunks = [
+            self._simulate_chunk(rng, min(chunk_rows, num_rows - start), block_weeks, max_weeks)
+            for start in range(0, num_rows, chunk_rows)
+        ]
+        return np.concatenate(chunks)
+
+    def _simulate_chunk(self, rng: np.random.Generator, num_rows: int, block_weeks: int,
+                        max_weeks: int | None) -> np.ndarray:
+
+        """
+        Runs the adaptive horizon simulation for num_rows replicas and
+        returns their completion weeks.
+        Every block works on three preallocated buffers (throughput, scratch and mask)
+        that are updated in place, instead of allocating new matrices per step.
+        """
+        backlog = self.parameters.backlog
+
+        results = np.zeros(num_rows, dtype=np.int64)
+        active = np.arange(num_rows) #replicas that haven't reached the backlog yet
+        carried = np.zeros(num_rows) #throughput accumulated so far by each active replica
+        weeks_done = 0
+
+        while active.size:
+            if max_weeks is not None:
+                if weeks_done >= max_weeks:
+                    raise RuntimeError(
+                        f"{active.size} replicas did not reach the backlog within {max_weeks} weeks"
+                    )
+                block_weeks = min(block_weeks, max_weeks - weeks_done)
+
+            shape = (active.size, block_weeks)
+            th_block = np.empty(shape, dtype=self.dtype)
+            scratch = np.empty(shape, dtype=self.dtype)
+            mask = np.empty(shape, dtype=bool)
+
+            th_block, scratch = self._draw_throughput(rng, th_block, scratch, mask)
+            self._apply_risks(th_block, rng, scratch, mask) #apply risks
+            del scratch #its memory goes to the cumulative sum, so the block still fits the budget
+            th_block = np.cumsum(th_block, axis=1) #acumulates the throughput of the block along the rows.
+            remaining = (backlog - carried).astype(self.dtype) #carried stays float64, only block sums use self.dtype
+            np.greater_equal(th_block, remaining[:, None], out=mask) #creates a boolean ndarray (mask)
+
+            finished = mask[:, -1] #throughput is positive, so the last week tells if the replica finished
+            results[active[finished]] = weeks_done + np.argmax(mask[finished], axis=1) + 1 #finds the column where the backlog is reached
+
+            carried = carried[~finished] + th_block[~finished, -1]
+            active = active[~finished]
+            weeks_done += block_weeks
+            block_weeks = max(4, math.ceil(0.25 * weeks_done)) #stragglers only need short extensions
+
+        return results
+
+    def _draw_throughput(self, rng: np.random.Generator, out: np.ndarray, scratch: np.ndarray,
+                         mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+
+        """
+        Fills the block with triangular throughput using the inverse CDF of uniform draws,
+        so the matrix is generated directly in the simulation dtype.
+        Both branches of the inverse CDF are computed in place (one in out, the other in
+        scratch) and merged with the mask. Returns (throughput, free scratch buffer).
+        """
+        left = self.parameters.th_min
+        mode = self.parameters.th_ex
+        right = self.parameters.th_max
+
+        self._draw_uniforms(rng, out, self.sampling)
+        np.less(out, (mode - left) / (right - left), out=mask) #uniforms that fall left of the mode
+
+        np.subtract(1, out, out=scratch) #right branch: right - sqrt((1-u)(right-left)(right-mode))
+        scratch *= (right - left) * (right - mode)
+        np.sqrt(scratch, out=scratch)
+        np.subtract(right, scratch, out=scratch)
+
+        out *= (right - left) * (mode - left) #left branch: left + sqrt(u(right-left)(mode-left))
+        np.sqrt(out, out=out)
+        out += left
+
+        np.copyto(scratch, out, where=mask)
+        return scratch, out
+
+    @staticmethod
+    def _draw_uniforms(rng: np.random.Generator, out: np.ndarray, sampling: str) -> None:
+
+        """
+        Fills the block with uniforms following the sampling mode:
+        - random: independent pseudo-random draws.
+        - antithetic: the second half of the replicas mirrors the first one (u -> 1 - u).
+        - lhs: every week is stratified, each replica falls in a different 1/rows slice.
+        - sobol: scrambled Sobol points, one dimension per week (needs scipy).
+        Risks use the same mode as the throughput, except with sobol where they are
+        drawn pseudo-randomly (a Sobol set per risk would be correlated with the throughput one).
+        """
+        rows, weeks = out.shape
+
+        if sampling == "random":
+            rng.random(out=out, dtype=out.dtype)
+
+        elif sampling == "antithetic":
+            half = (rows + 1) // 2
+            rng.random(out=out[:half], dtype=out.dtype)
+            np.subtract(1, out[:rows - half], out=out[half:])
+
+        elif sampling == "lhs":
+            for week in range(weeks):
+                out[:, week] = (rng.permutation(rows) + rng.random(rows)) / rows
+
+        elif sampling == "sobol":
+            try:
+                from scipy.stats import qmc
+            except ImportError as e:
+                raise ImportError("sampling='sobol' requires scipy to be installed") from e
+            points = qmc.Sobol(d=weeks, scramble=True, seed=rng).random_base2(math.ceil(math.log2(rows)))
+            out[...] = points[:rows]
+
+    def _settings(self) -> dict:
+
+        """
+        Constructor arguments needed to rebuild this simulator in a worker process.
+        """
+        return {
+            "parameters": self.parameters,
+            "risks": self.risks,
+            "memory_budget_mb": self.memory_budget_mb,
+            "precision": self.precision,
+            "sampling": self.sampling,
+        }
+
+    def _chunk_rows(self, block_weeks: int) -> int:
+
+        """
+        Number of replicas that fit in the memory budget for a block of block_weeks.
+        Every cell of the block costs the throughput and scratch buffers plus the boolean
+        mask, no matter how many risks there are.
+        """
+        bytes_per_cell = 2 * np.dtype(self.dtype).itemsize + 1
+        budget = self.memory_budget_mb * 1024 ** 2
+        return max(1, int(budget // (bytes_per_cell * block_weeks)))
+
+    def _initial_horizon(self) -> int:
+
+        """
+        Sizes the first block of weeks from the expected completion time
+        (backlog / expected throughput after risks) with some margin, so most
+        replicas finish in the first block and only the tail needs extensions.
+        """
+        expected_th = (self.parameters.th_min + self.parameters.th_ex + self.parameters.th_max) / 3
         for risk in self.risks:
-            risk_mask = np.random.rand(*th_base_matrix.shape) < risk.probability #creates a mask where true = rand < risk.probability
-            adjusted = np.where(risk_mask, adjusted * risk.impact, adjusted) #apply risks using the mask as filter
-        return adjusted
+            expected_th *= 1 - risk.probability * (1 - risk.impact)
+
+        return math.ceil(1.25 * self.parameters.backlog / expected_th) + 1
+
+    def _apply_risks(self, th_matrix: np.ndarray, rng: np.random.Generator, scratch: np.ndarray | None = None,
+                     mask: np.ndarray | None = None) -> np.ndarray:
+
+        """
+        Apply risks to the throughput in place.
+        Every risk reuses the same scratch buffer for its uniform draws and the same
+        boolean mask, and the impact is multiplied only where the mask is True, so the
+        cost per risk is a pass over the matrix instead of two new full-size temporaries.
+        The risks acumulate: a week hit by several risks gets all their impacts.
+        """
+        if scratch is None:
+            scratch = np.empty_like(th_matrix)
+        if mask is None:
+            mask = np.empty(th_matrix.shape, dtype=bool)
+
+        risk_sampling = "random" if self.sampling == "sobol" else self.sampling #low dimensional only for throughput
+        for risk in self.risks:
+            self._draw_uniforms(rng, scratch, risk_sampling)
+            np.less(scratch, risk.probability, out=mask) #creates a mask where true = rand < risk.probability
+            np.multiply(th_matrix, risk.impact, out=th_matrix, where=mask) #apply risks using the mask as filter
+        return th_matrix
 
     def get_results(self) -> np.ndarray:
         """
@@ -62,3 +447,31 @@ class Simulator:
         if self.results is None:
             raise RuntimeError("The simulation has not been run yet")
         return self.results
+
+    def get_histogram(self) -> CompletionHistogram:
+        """
+        The results as a CompletionHistogram (counts per week), to cache, send or merge them.
+        """
+        return CompletionHistogram.from_results(self.get_results())
+
+
+def compact_weeks(results: np.ndarray, dtype: type) -> np.ndarray:
+    """
+    Casts completion weeks to the precision policy dtype. If some week doesn't fit
+    (over 65535 weeks for uint16) it uses the next unsigned type instead of overflowing.
+    """
+    dtype = np.dtype(dtype)
+    largest = int(results.max()) if results.size else 0
+    while largest > np.iinfo(dtype).max:
+        dtype = np.dtype(np.uint32 if dtype.itemsize < 4 else np.int64)
+    return results.astype(dtype, copy=False)
+
+
+def _run_shard(settings: dict, engine: str, num_rows: int, seed: np.random.SeedSequence, block_weeks: int,
+               max_weeks: int | None) -> np.ndarray:
+    """
+    Runs one shard of a simulation. It lives at module level so the process pool can pickle it.
+    """
+    simulator = Simulator(**settings)
+    results = get_backend(engine).simulate(simulator, np.random.default_rng(seed), num_rows, block_weeks, max_weeks)
+    return compact_weeks(results, simulator.weeks_dtype) #compact before leaving the worker
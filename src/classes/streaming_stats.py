@@ -0,0 +1,242 @@
+"""
+Statistics of a stream of completion weeks that never keep the whole stream in memory.
+RunningMoments keeps count, mean, variance, min and max exactly. KLLSketch keeps a
+small, mergeable summary that answers quantiles with a bounded rank error. Both can be
+merged (e.g. parallel runs) and serialized (checkpoint, then resume).
+"""
+
+import math
+import numpy as np
+
+
+class RunningMoments:
+    """
+    Exact count, mean, variance, min and max of a stream, updated one batch at a time
+    (the pairwise update of Chan et al., numerically stable for long streams).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0 #sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            batch = RunningMoments()
+            batch.count = values.size
+            batch.mean = float(values.mean())
+            batch.m2 = float(((values - batch.mean) ** 2).sum())
+            batch.min, batch.max = float(values.min()), float(values.max())
+            self._combine(batch)
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        merged = RunningMoments.from_dict(self.to_dict())
+        merged._combine(other)
+        return merged
+
+    def _combine(self, other: "RunningMoments") -> None:
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def variance(self, ddof: int = 0) -> float:
+        if self.count <= ddof:
+            raise ValueError("Not enough values for this ddof")
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 0) -> float:
+        return math.sqrt(self.variance(ddof))
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @staticmethod
+    def from_dict(data: dict) -> "RunningMoments":
+        moments = RunningMoments()
+        for key in ("count", "mean", "m2", "min", "max"):
+            if key not in data:
+                raise ValueError(f"Field {key} is missing")
+            setattr(moments, key, data[key])
+        return moments
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty, 2016).
+    Values go into level 0. When the sketch holds more items than its capacity, the
+    lowest full level is sorted and every other item (random offset) moves to the next
+    level, where each item stands for twice as many values. Capacities shrink by 2/3
+    from the top level down, so the sketch keeps about 3k items whatever the stream length.
+
+    Error bound: the rank of a returned quantile is within rank_error() * n of the
+    requested rank with about 99% confidence. rank_error() is the empirical fit used by
+    Apache DataSketches for KLL, 2.296 / k^0.9723: about 1.3% for k=200 and 0.3% for
+    k=1000. While nothing has been compacted the answers are exact.
+    """
+
+    DECAY = 2 / 3
+
+    def __init__(self, k: int = 200, seed: int | None = None):
+        if k is None or k < 8:
+            raise ValueError("k must be an integer >= 8")
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+
+    def rank_error(self) -> float:
+        """Normalized rank error (fraction of n) of a single quantile, ~99% confidence."""
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, math.ceil(self.k * self.DECAY ** depth))
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.count += values.size
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Sketch of both streams: the levels are concatenated and compressed again.
+        """
+        if not isinstance(other, KLLSketch):
+            raise TypeError("Only a KLLSketch can be merged")
+        merged = KLLSketch.from_dict(self.to_dict())
+        merged.k = max(self.k, other.k)
+        for level, items in enumerate(other.levels):
+            if level == len(merged.levels):
+                merged.levels.append(np.empty(0))
+            merged.levels[level] = np.concatenate([merged.levels[level], items])
+        merged.count += other.count
+        merged._compress()
+        return merged
+
+    def _compress(self) -> None:
+        while sum(items.size for items in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            level = next(h for h, items in enumerate(self.levels) if items.size > self._capacity(h))
+            if level == len(self.levels) - 1:
+                self.levels.append(np.empty(0))
+
+            items = np.sort(self.levels[level])
+            kept = items[:items.size % 2] #an odd item stays at its level
+            pairs = items[items.size % 2:]
+            self.levels[level] = kept
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[self.rng.integers(2)::2]])
+
+    def quantile(self, q):
+        """
+        Value(s) at quantile q (between 0 and 1).
+        """
+        if not self.count:
+            raise ValueError("The sketch is empty")
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+
+        #ranks are on the weight the sketch holds, which can differ a little from count
+        targets = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, targets, side="left"), items.size - 1)
+        values = items[positions]
+        return float(values) if np.ndim(values) == 0 else values
+
+    def size(self) -> int:
+        """Number of items kept."""
+        return sum(items.size for items in self.levels)
+
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "count": self.count,
+            "levels": [items.tolist() for items in self.levels],
+            "rng_state": self.rng.bit_generator.state,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "KLLSketch":
+        for key in ("k", "count", "levels"):
+            if key not in data:
+                raise ValueError(f"Field {key} is missing")
+        sketch = KLLSketch(data["k"])
+        sketch.count = data["count"]
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in data["levels"]]
+        if "rng_state" in data:
+            sketch.rng.bit_generator.state = data["rng_state"]
+        return sketch
+
+
+class StreamingStats:
+    """
+    Running moments plus a KLL sketch of a stream of completion weeks.
+    Feed it batches (see Simulator.run_streaming) and ask for percentiles at any point;
+    to_dict/from_dict checkpoint it (including the simulator seed state, if any).
+    """
+
+    def __init__(self, k: int = 200, seed: int | None = None):
+        self.moments = RunningMoments()
+        self.sketch = KLLSketch(k, seed)
+        self.seed_state = None #set by Simulator.run_streaming so a resumed run draws new replicas
+
+    @property
+    def num_sim(self) -> int:
+        return self.moments.count
+
+    def update(self, values: np.ndarray) -> None:
+        self.moments.update(values)
+        self.sketch.update(values)
+
+    def merge(self, other: "StreamingStats") -> "StreamingStats":
+        merged = StreamingStats(self.sketch.k)
+        merged.moments = self.moments.merge(other.moments)
+        merged.sketch = self.sketch.merge(other.sketch)
+        return merged
+
+    def percentile(self, q):
+        """
+        Approximate percentile(s) q (0-100); see KLLSketch for the error bound.
+        """
+        return self.sketch.quantile(np.asarray(q, dtype=np.float64) / 100)
+
+    def mean(self) -> float:
+        return self.moments.mean
+
+    def std(self, ddof: int = 0) -> float:
+        return self.moments.std(ddof)
+
+    def rank_error(self) -> float:
+        return self.sketch.rank_error()
+
+    def summary(self, percentiles=(0.5, 0.9)) -> dict:
+        """
+        Same keys as SimulationAnalyzer.percentiles ({'pXX': value}).
+        """
+        values = self.sketch.quantile(np.asarray(percentiles, dtype=np.float64))
+        return {f"p{int(p*100)}": float(value) for p, value in zip(percentiles, np.atleast_1d(values))}
+
+    def to_dict(self) -> dict:
+        return {"moments": self.moments.to_dict(), "sketch": self.sketch.to_dict(), "seed_state": self.seed_state}
+
+    @staticmethod
+    def from_dict(data: dict) -> "StreamingStats":
+        for key in ("moments", "sketch"):
+            if key not in data:
+                raise ValueError(f"Field {key} is missing")
+        stats = StreamingStats()
+        stats.moments = RunningMoments.from_dict(data["moments"])
+        stats.sketch = KLLSketch.from_dict(data["sketch"])
+        stats.seed_state = data.get("seed_state")
+        return stats
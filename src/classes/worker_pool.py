@@ -0,0 +1,21 @@
+"""
+Warm worker pools, shared by RenderPipeline and LocalJobQueue.
+"""
+
+
+def start_pool(executor: str, workers: int, initializer=None):
+    """
+    Process (executor="process") or thread pool of workers whose initializer has already
+    run: one trivial task per worker makes them all start now, not on the first tasks.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    pool = pool_class(max_workers=workers, initializer=initializer)
+    for future in [pool.submit(_ready) for _ in range(workers)]:
+        future.result()
+    return pool
+
+
+def _ready() -> bool:
+    return True